@@ -10,17 +10,27 @@ import os
 import sys
 from datetime import datetime
 
-import httpx
 from dotenv import load_dotenv
-from playwright.async_api import async_playwright
 
+from utils.browser import USER_AGENT, get_waf_cookies_with_playwright
+from utils.browser_pool import BrowserWorkerPool, get_browser_workers
 from utils.config import AccountConfig, AppConfig, load_accounts_config
+from utils.discovery import discover_providers, is_waf_challenge
+from utils.log import get_logger, setup_logging
 from utils.notify import notify
+from utils.report import RunReport
+from utils.session import ClientPool, WafCookieCache, build_cookie_header
+from utils.warmup import warm_up_providers
 
 load_dotenv()
 
+logger = get_logger()
+
 BALANCE_HASH_FILE = 'balance_hash.txt'
 
+# 主进程中同一时间只启动一个浏览器
+browser_lock = asyncio.Lock()
+
 
 def load_balance_hash():
 	"""加载余额hash"""
@@ -39,7 +49,7 @@ def save_balance_hash(balance_hash):
 		with open(BALANCE_HASH_FILE, 'w', encoding='utf-8') as f:
 			f.write(balance_hash)
 	except Exception as e:
-		print(f'Warning: Failed to save balance hash: {e}')
+		logger.warning(f'Failed to save balance hash: {e}')
 
 
 def generate_balance_hash(balances):
@@ -65,76 +75,18 @@ def parse_cookies(cookies_data):
 	return {}
 
 
-async def get_waf_cookies_with_playwright(account_name: str, login_url: str):
-	"""使用 Playwright 获取 WAF cookies（隐私模式）"""
-	print(f'[PROCESSING] {account_name}: Starting browser to get WAF cookies...')
-
-	async with async_playwright() as p:
-		import tempfile
-
-		with tempfile.TemporaryDirectory() as temp_dir:
-			context = await p.chromium.launch_persistent_context(
-				user_data_dir=temp_dir,
-				headless=False,
-				user_agent='Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/138.0.0.0 Safari/537.36',
-				viewport={'width': 1920, 'height': 1080},
-				args=[
-					'--disable-blink-features=AutomationControlled',
-					'--disable-dev-shm-usage',
-					'--disable-web-security',
-					'--disable-features=VizDisplayCompositor',
-					'--no-sandbox',
-				],
-			)
-
-			page = await context.new_page()
-
-			try:
-				print(f'[PROCESSING] {account_name}: Access login page to get initial cookies...')
-
-				await page.goto(login_url, wait_until='networkidle')
-
-				try:
-					await page.wait_for_function('document.readyState === "complete"', timeout=5000)
-				except Exception:
-					await page.wait_for_timeout(3000)
-
-				cookies = await page.context.cookies()
-
-				waf_cookies = {}
-				for cookie in cookies:
-					cookie_name = cookie.get('name')
-					cookie_value = cookie.get('value')
-					if cookie_name in ['acw_tc', 'cdn_sec_tc', 'acw_sc__v2'] and cookie_value is not None:
-						waf_cookies[cookie_name] = cookie_value
-
-				print(f'[INFO] {account_name}: Got {len(waf_cookies)} WAF cookies')
-
-				required_cookies = ['acw_tc', 'cdn_sec_tc', 'acw_sc__v2']
-				missing_cookies = [c for c in required_cookies if c not in waf_cookies]
-
-				if missing_cookies:
-					print(f'[FAILED] {account_name}: Missing WAF cookies: {missing_cookies}')
-					await context.close()
-					return None
-
-				print(f'[SUCCESS] {account_name}: Successfully got all WAF cookies')
-
-				await context.close()
-
-				return waf_cookies
-
-			except Exception as e:
-				print(f'[FAILED] {account_name}: Error occurred while getting WAF cookies: {e}')
-				await context.close()
-				return None
-
-
 def get_user_info(client, headers, user_info_url: str):
 	"""获取用户信息"""
 	try:
 		response = client.get(user_info_url, headers=headers, timeout=30)
 
+		if is_waf_challenge(response):
+			return {
+				'success': False,
+				'waf_challenge': True,
+				'error': 'Failed to get user info: blocked by WAF challenge',
+			}
+
 		if response.status_code == 200:
 			data = response.json()
 			if data.get('success'):
@@ -152,25 +104,74 @@ def get_user_info(client, headers, user_info_url: str):
 		return {'success': False, 'error': f'Failed to get user info: {str(e)[:50]}...'}
 
 
-async def prepare_cookies(account_name: str, provider_config, user_cookies: dict) -> dict | None:
-	"""准备请求所需的 cookies（可能包含 WAF cookies）"""
+async def acquire_waf_cookies(account_name: str, provider_config, browser_pool: BrowserWorkerPool | None = None):
+	"""获取 WAF cookies，开启浏览器 worker 进程池时在 worker 进程中执行"""
+	login_url = f'{provider_config.domain}{provider_config.login_path}'
+	if browser_pool:
+		return await browser_pool.get_waf_cookies(account_name, login_url)
+
+	async with browser_lock:
+		return await get_waf_cookies_with_playwright(account_name, login_url)
+
+
+async def prepare_cookies(
+	account_name: str,
+	provider_config,
+	user_cookies: dict,
+	browser_pool: BrowserWorkerPool | None = None,
+	cookie_cache: WafCookieCache | None = None,
+) -> dict | None:
+	"""准备请求所需的 cookies（可能包含 WAF cookies）
+
+	签到时每个账号单独获取 WAF cookies（隐私模式）；传入 cookie_cache 时同一 provider 的账号共享 cookies
+	"""
+	log = logger.bind(account=account_name, provider=provider_config.name)
 	waf_cookies = {}
 
 	if provider_config.needs_waf_cookies():
-		login_url = f'{provider_config.domain}{provider_config.login_path}'
-		waf_cookies = await get_waf_cookies_with_playwright(account_name, login_url)
+		if cookie_cache is None:
+			waf_cookies = await acquire_waf_cookies(account_name, provider_config, browser_pool)
+		else:
+			# 加锁避免同一 provider 并发启动多个浏览器
+			async with cookie_cache.lock(provider_config.name):
+				waf_cookies = cookie_cache.get(provider_config.name)
+				if waf_cookies:
+					log.info('Reusing cached WAF cookies')
+				else:
+					waf_cookies = await acquire_waf_cookies(account_name, provider_config, browser_pool)
+					if waf_cookies:
+						cookie_cache.set(provider_config.name, waf_cookies)
 		if not waf_cookies:
-			print(f'[FAILED] {account_name}: Unable to get WAF cookies')
+			log.error('Unable to get WAF cookies')
 			return None
 	else:
-		print(f'[INFO] {account_name}: Bypass WAF not required, using user cookies directly')
+		log.info('Bypass WAF not required, using user cookies directly')
 
 	return {**waf_cookies, **user_cookies}
 
 
+def build_headers(provider_config, account: AccountConfig, cookies: dict) -> dict:
+	"""构建 API 请求头，cookies 通过 Cookie 请求头传递以便共享连接池"""
+	return {
+		'User-Agent': USER_AGENT,
+		'Accept': 'application/json, text/plain, */*',
+		'Accept-Language': 'zh-CN,zh;q=0.9,en;q=0.8',
+		'Accept-Encoding': 'gzip, deflate, br, zstd',
+		'Referer': provider_config.domain,
+		'Origin': provider_config.domain,
+		'Connection': 'keep-alive',
+		'Sec-Fetch-Dest': 'empty',
+		'Sec-Fetch-Mode': 'cors',
+		'Sec-Fetch-Site': 'same-origin',
+		'Cookie': build_cookie_header(cookies),
+		provider_config.api_user_key: account.api_user,
+	}
+
+
 def execute_check_in(client, account_name: str, provider_config, headers: dict):
 	"""执行签到请求"""
-	print(f'[NETWORK] {account_name}: Executing check-in')
+	log = logger.bind(account=account_name, provider=provider_config.name)
+	log.info('Executing check-in', tag='NETWORK')
 
 	checkin_headers = headers.copy()
 	checkin_headers.update({'Content-Type': 'application/json', 'X-Requested-With': 'XMLHttpRequest'})
@@ -178,106 +179,112 @@ def execute_check_in(client, account_name: str, provider_config, headers: dict):
 	sign_in_url = f'{provider_config.domain}{provider_config.sign_in_path}'
 	response = client.post(sign_in_url, headers=checkin_headers, timeout=30)
 
-	print(f'[RESPONSE] {account_name}: Response status code {response.status_code}')
+	log.info(f'Response status code {response.status_code}', tag='RESPONSE')
 
 	if response.status_code == 200:
 		try:
 			result = response.json()
 			if result.get('ret') == 1 or result.get('code') == 0 or result.get('success'):
-				print(f'[SUCCESS] {account_name}: Check-in successful!')
+				log.info('Check-in successful!', tag='SUCCESS')
 				return True
 			else:
 				error_msg = result.get('msg', result.get('message', 'Unknown error'))
-				print(f'[FAILED] {account_name}: Check-in failed - {error_msg}')
+				log.error(f'Check-in failed - {error_msg}')
 				return False
 		except json.JSONDecodeError:
 			# 如果不是 JSON 响应，检查是否包含成功标识
 			if 'success' in response.text.lower():
-				print(f'[SUCCESS] {account_name}: Check-in successful!')
+				log.info('Check-in successful!', tag='SUCCESS')
 				return True
 			else:
-				print(f'[FAILED] {account_name}: Check-in failed - Invalid response format')
+				log.error('Check-in failed - Invalid response format')
 				return False
 	else:
-		print(f'[FAILED] {account_name}: Check-in failed - HTTP {response.status_code}')
+		log.error(f'Check-in failed - HTTP {response.status_code}')
 		return False
 
 
-async def check_in_account(account: AccountConfig, account_index: int, app_config: AppConfig):
+async def check_in_account(
+	account: AccountConfig,
+	account_index: int,
+	app_config: AppConfig,
+	client_pool: ClientPool,
+	browser_pool: BrowserWorkerPool | None = None,
+):
 	"""为单个账号执行签到操作"""
 	account_name = account.get_display_name(account_index)
-	print(f'\n[PROCESSING] Starting to process {account_name}')
+	log = logger.bind(account=account_name, provider=account.provider)
+	log.info('Starting to process', tag='PROCESSING')
 
 	provider_config = app_config.get_provider(account.provider)
 	if not provider_config:
-		print(f'[FAILED] {account_name}: Provider "{account.provider}" not found in configuration')
+		log.error(f'Provider "{account.provider}" not found in configuration')
 		return False, None
 
-	print(f'[INFO] {account_name}: Using provider "{account.provider}" ({provider_config.domain})')
+	log.info(f'Using provider "{account.provider}" ({provider_config.domain})')
 
 	user_cookies = parse_cookies(account.cookies)
 	if not user_cookies:
-		print(f'[FAILED] {account_name}: Invalid configuration format')
+		log.error('Invalid configuration format')
 		return False, None
 
-	all_cookies = await prepare_cookies(account_name, provider_config, user_cookies)
+	all_cookies = await prepare_cookies(account_name, provider_config, user_cookies, browser_pool)
 	if not all_cookies:
 		return False, None
 
-	client = httpx.Client(http2=True, timeout=30.0)
+	client = client_pool.get(provider_config)
 
 	try:
-		client.cookies.update(all_cookies)
-
-		headers = {
-			'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/138.0.0.0 Safari/537.36',
-			'Accept': 'application/json, text/plain, */*',
-			'Accept-Language': 'zh-CN,zh;q=0.9,en;q=0.8',
-			'Accept-Encoding': 'gzip, deflate, br, zstd',
-			'Referer': provider_config.domain,
-			'Origin': provider_config.domain,
-			'Connection': 'keep-alive',
-			'Sec-Fetch-Dest': 'empty',
-			'Sec-Fetch-Mode': 'cors',
-			'Sec-Fetch-Site': 'same-origin',
-			provider_config.api_user_key: account.api_user,
-		}
+		headers = build_headers(provider_config, account, all_cookies)
 
 		user_info_url = f'{provider_config.domain}{provider_config.user_info_path}'
-		user_info = get_user_info(client, headers, user_info_url)
+		# 同步请求放到 provider 专用线程池中执行，使多个账号的请求可以在 provider 限制器允许的范围内并发
+		user_info = await client_pool.run(provider_config, get_user_info, client, headers, user_info_url)
 		if user_info and user_info.get('success'):
-			print(user_info['display'])
+			log.info(user_info['display'])
 		elif user_info:
-			print(user_info.get('error', 'Unknown error'))
+			log.warning(user_info.get('error', 'Unknown error'))
 
 		if provider_config.needs_manual_check_in():
-			success = execute_check_in(client, account_name, provider_config, headers)
+			success = await client_pool.run(
+				provider_config, execute_check_in, client, account_name, provider_config, headers
+			)
 			return success, user_info
 		else:
-			print(f'[INFO] {account_name}: Check-in completed automatically (triggered by user info request)')
+			log.info('Check-in completed automatically (triggered by user info request)')
 			return True, user_info
 
 	except Exception as e:
-		print(f'[FAILED] {account_name}: Error occurred during check-in process - {str(e)[:50]}...')
+		log.error(f'Error occurred during check-in process - {str(e)[:50]}...')
 		return False, None
-	finally:
-		client.close()
 
 
 async def main():
 	"""主函数"""
-	print('[SYSTEM] AnyRouter.top multi-account auto check-in script started (using Playwright)')
-	print(f'[TIME] Execution time: {datetime.now().strftime("%Y-%m-%d %H:%M:%S")}')
+	setup_logging()
+	report = RunReport()
+	logger.info('AnyRouter.top multi-account auto check-in script started (using Playwright)', tag='SYSTEM')
+	logger.info(f'Execution time: {datetime.now().strftime("%Y-%m-%d %H:%M:%S")}', tag='TIME')
 
 	app_config = AppConfig.load_from_env()
-	print(f'[INFO] Loaded {len(app_config.providers)} provider configuration(s)')
+	logger.info(f'Loaded {len(app_config.providers)} provider configuration(s)')
 
 	accounts = load_accounts_config()
 	if not accounts:
-		print('[FAILED] Unable to load account configuration, program exits')
+		logger.error('Unable to load account configuration, program exits')
 		sys.exit(1)
 
-	print(f'[INFO] Found {len(accounts)} account configurations')
+	logger.info(f'Found {len(accounts)} account configurations')
+
+	# 在启动浏览器前并行预热各 provider 连接，并跳过无法访问的 provider
+	client_pool = ClientPool()
+	provider_names = {account.provider for account in accounts}
+	used_providers = [provider for name in sorted(provider_names) if (provider := app_config.get_provider(name))]
+	report.host_timings = await warm_up_providers(used_providers, client_pool)
+	unreachable_providers = {name for name, timing in report.host_timings.items() if not timing.reachable}
+	report.skipped_providers = sorted(unreachable_providers)
+
+	await discover_providers(app_config, provider_names - unreachable_providers, client_pool)
 
 	last_balance_hash = load_balance_hash()
 
@@ -288,10 +295,34 @@ async def main():
 	need_notify = False  # 是否需要发送通知
 	balance_changed = False  # 余额是否有变化
 
-	for i, account in enumerate(accounts):
+	browser_workers = get_browser_workers()
+	browser_pool = BrowserWorkerPool(browser_workers) if browser_workers else None
+	if browser_pool:
+		logger.info(f'Using {browser_workers} browser worker process(es) for WAF cookies')
+
+	async def process_account(i: int, account: AccountConfig):
+		if account.provider in unreachable_providers:
+			logger.bind(account=account.get_display_name(i), provider=account.provider).error(
+				'Provider unreachable, skipped before launching browser'
+			)
+			return False, None
+		return await check_in_account(account, i, app_config, client_pool, browser_pool)
+
+	# 各账号并发处理，浏览器阶段由 worker 进程池（或主进程浏览器锁）控制并发
+	try:
+		results = await asyncio.gather(
+			*(process_account(i, account) for i, account in enumerate(accounts)), return_exceptions=True
+		)
+	finally:
+		if browser_pool:
+			browser_pool.shutdown()
+
+	for i, (account, result) in enumerate(zip(accounts, results)):
 		account_key = f'account_{i + 1}'
 		try:
-			success, user_info = await check_in_account(account, i, app_config)
+			if isinstance(result, BaseException):
+				raise result
+			success, user_info = result
 			if success:
 				success_count += 1
 
@@ -301,7 +332,7 @@ async def main():
 				should_notify_this_account = True
 				need_notify = True
 				account_name = account.get_display_name(i)
-				print(f'[NOTIFY] {account_name} failed, will send notification')
+				logger.bind(account=account_name).info('Failed, will send notification', tag='NOTIFY')
 
 			if user_info and user_info.get('success'):
 				current_quota = user_info['quota']
@@ -320,10 +351,15 @@ async def main():
 
 		except Exception as e:
 			account_name = account.get_display_name(i)
-			print(f'[FAILED] {account_name} processing exception: {e}')
+			logger.bind(account=account_name).error(f'Processing exception: {e}')
 			need_notify = True  # 异常也需要通知
 			notification_content.append(f'[FAIL] {account_name} exception: {str(e)[:50]}...')
 
+	report.concurrency = {name: limiter.snapshot() for name, limiter in client_pool.limiters.items()}
+	client_pool.close()
+	report.log()
+	report.save()
+
 	# 检查余额变化
 	current_balance_hash = generate_balance_hash(current_balances) if current_balances else None
 	if current_balance_hash:
@@ -331,14 +367,14 @@ async def main():
 			# 首次运行
 			balance_changed = True
 			need_notify = True
-			print('[NOTIFY] First run detected, will send notification with current balances')
+			logger.info('First run detected, will send notification with current balances', tag='NOTIFY')
 		elif current_balance_hash != last_balance_hash:
 			# 余额有变化
 			balance_changed = True
 			need_notify = True
-			print('[NOTIFY] Balance changes detected, will send notification')
+			logger.info('Balance changes detected, will send notification', tag='NOTIFY')
 		else:
-			print('[INFO] No balance changes detected')
+			logger.info('No balance changes detected')
 
 	# 为有余额变化的情况添加所有成功账号到通知内容
 	if balance_changed:
@@ -376,11 +412,11 @@ async def main():
 
 		notify_content = '\n\n'.join([time_info, '\n'.join(notification_content), '\n'.join(summary)])
 
-		print(notify_content)
+		logger.info(notify_content, tag='NOTIFY')
 		notify.push_message('AnyRouter Check-in Alert', notify_content, msg_type='text')
-		print('[NOTIFY] Notification sent due to failures or balance changes')
+		logger.info('Notification sent due to failures or balance changes', tag='NOTIFY')
 	else:
-		print('[INFO] All accounts successful and no balance changes detected, notification skipped')
+		logger.info('All accounts successful and no balance changes detected, notification skipped')
 
 	# 设置退出码
 	sys.exit(0 if success_count > 0 else 1)
@@ -391,10 +427,10 @@ def run_main():
 	try:
 		asyncio.run(main())
 	except KeyboardInterrupt:
-		print('\n[WARNING] Program interrupted by user')
+		logger.warning('Program interrupted by user')
 		sys.exit(1)
 	except Exception as e:
-		print(f'\n[FAILED] Error occurred during program execution: {e}')
+		logger.error(f'Error occurred during program execution: {e}')
 		sys.exit(1)
 
 
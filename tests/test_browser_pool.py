@@ -0,0 +1,116 @@
+import asyncio
+import os
+import sys
+import time
+from pathlib import Path
+
+# 添加项目根目录到 PATH
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from utils.browser_pool import BrowserWorkerPool
+
+COOKIES = {'acw_tc': 'tc', 'cdn_sec_tc': 'sec', 'acw_sc__v2': 'v2'}
+
+
+# 以下函数在 spawn 出的 worker 进程中执行，login_url 参数用作标记文件路径
+
+
+def _noop_init():
+	pass
+
+
+def _crash_once(account_name: str, marker: str) -> dict:
+	if not os.path.exists(marker):
+		Path(marker).touch()
+		os._exit(1)
+	return COOKIES
+
+
+def _always_crash(account_name: str, marker: str) -> dict:
+	os._exit(1)
+
+
+def _hang_once(account_name: str, marker: str) -> dict:
+	if not os.path.exists(marker):
+		Path(marker).touch()
+		time.sleep(60)
+	return COOKIES
+
+
+def _slow(account_name: str, marker: str) -> dict:
+	time.sleep(1.5)
+	return COOKIES
+
+
+def _hang_first_account(account_name: str, marker: str) -> dict:
+	with open(f'{marker}.calls', 'a') as f:
+		f.write(f'{account_name}\n')
+	if account_name == 'Account 1' and not os.path.exists(marker):
+		Path(marker).touch()
+		time.sleep(60)
+	time.sleep(1)
+	return COOKIES
+
+
+def run_pool_concurrently(task, marker: Path, workers: int, accounts: int, task_timeout: float):
+	pool = BrowserWorkerPool(workers, task_timeout=task_timeout, task=task, initializer=_noop_init)
+
+	async def run():
+		return await asyncio.gather(*(pool.get_waf_cookies(f'Account {i + 1}', str(marker)) for i in range(accounts)))
+
+	try:
+		return asyncio.run(run()), pool
+	finally:
+		pool.shutdown()
+
+
+def run_pool(task, marker: Path, task_timeout: float = 30.0):
+	pool = BrowserWorkerPool(1, task_timeout=task_timeout, task=task, initializer=_noop_init)
+	try:
+		return asyncio.run(pool.get_waf_cookies('Account 1', str(marker))), pool
+	finally:
+		pool.shutdown()
+
+
+def test_restart_and_retry_after_worker_crash(tmp_path):
+	cookies, pool = run_pool(_crash_once, tmp_path / 'marker')
+
+	assert cookies == COOKIES
+	assert pool.restarts == 1
+
+
+def test_give_up_after_repeated_crashes(tmp_path):
+	cookies, pool = run_pool(_always_crash, tmp_path / 'marker')
+
+	assert cookies is None
+	assert pool.restarts == 2
+
+
+def test_terminate_hung_worker_and_retry(tmp_path):
+	start = time.perf_counter()
+	cookies, pool = run_pool(_hang_once, tmp_path / 'marker', task_timeout=3.0)
+
+	assert cookies == COOKIES
+	assert pool.restarts == 1
+	assert time.perf_counter() - start < 30
+
+
+def test_queue_wait_does_not_count_towards_timeout(tmp_path):
+	# 4 个任务共用 1 个 worker，总耗时超过单次超时，但每个任务的执行时间都在超时内
+	results, pool = run_pool_concurrently(_slow, tmp_path / 'marker', workers=1, accounts=4, task_timeout=3.0)
+
+	assert results == [COOKIES] * 4
+	assert pool.restarts == 0
+
+
+def test_hung_worker_does_not_affect_other_workers(tmp_path):
+	results, pool = run_pool_concurrently(
+		_hang_first_account, tmp_path / 'marker', workers=2, accounts=6, task_timeout=3.0
+	)
+
+	assert results == [COOKIES] * 6
+	assert pool.restarts == 1
+	# 只有卡住的账号被重试，其他 worker 上的任务没有被中断
+	calls = (tmp_path / 'marker.calls').read_text().splitlines()
+	assert sorted(calls) == sorted([f'Account {i + 1}' for i in range(6)] + ['Account 1'])
@@ -0,0 +1,173 @@
+import asyncio
+import sys
+import time
+from pathlib import Path
+
+import httpx
+import pytest
+
+# 添加项目根目录到 PATH
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from utils.config import AppConfig, ProviderCapabilities, ProviderConfig
+from utils.discovery import CapabilityCache, discover_providers, is_waf_challenge, probe_provider
+from utils.session import ClientPool
+
+WAF_CHALLENGE_PAGE = '<html><script>var arg1="ABC";</script></html>'
+
+
+@pytest.fixture
+def provider_config():
+	return ProviderConfig(name='customrouter', domain='https://custom.example.com', discover=True)
+
+
+def mock_client(status_response: httpx.Response, sign_in_response: httpx.Response | None = None, calls=None):
+	"""按路径返回状态接口与签到接口响应的客户端"""
+
+	def handler(request):
+		if calls is not None:
+			calls.append(request.url.path)
+		if request.url.path == '/api/status':
+			return status_response
+		return sign_in_response or httpx.Response(404)
+
+	return httpx.Client(transport=httpx.MockTransport(handler))
+
+
+def html_response(text: str, status_code: int = 200) -> httpx.Response:
+	return httpx.Response(status_code, text=text, headers={'content-type': 'text/html'})
+
+
+def test_is_waf_challenge():
+	challenge = httpx.Response(200, text=WAF_CHALLENGE_PAGE, headers={'content-type': 'text/html'})
+	json_response = httpx.Response(200, json={'success': True, 'data': {}})
+
+	assert is_waf_challenge(challenge)
+	assert not is_waf_challenge(json_response)
+
+
+def test_capability_cache_round_trip(tmp_path, provider_config):
+	cache_file = tmp_path / 'provider_cache.json'
+	capabilities = ProviderCapabilities(bypass_method='waf_cookies', sign_in_available=True, discovered_at=time.time())
+
+	cache = CapabilityCache(str(cache_file), ttl=3600)
+	cache.set(provider_config, capabilities)
+	cache.save()
+
+	reloaded = CapabilityCache(str(cache_file), ttl=3600)
+	reloaded.load()
+	assert reloaded.get(provider_config) == capabilities
+
+
+def test_capability_cache_expired(tmp_path, provider_config):
+	cache = CapabilityCache(str(tmp_path / 'provider_cache.json'), ttl=60)
+	cache.set(
+		provider_config,
+		ProviderCapabilities(bypass_method=None, sign_in_available=False, discovered_at=time.time() - 120),
+	)
+
+	assert cache.get(provider_config) is None
+
+
+def test_capabilities_override_bypass_method(provider_config):
+	assert not provider_config.needs_waf_cookies()
+
+	provider_config.capabilities = ProviderCapabilities(
+		bypass_method='waf_cookies', sign_in_available=True, discovered_at=time.time()
+	)
+
+	assert provider_config.needs_waf_cookies()
+	assert provider_config.needs_manual_check_in()
+
+
+def test_cache_key_includes_paths(tmp_path, provider_config):
+	cache = CapabilityCache(str(tmp_path / 'provider_cache.json'), ttl=3600)
+	cache.set(
+		provider_config, ProviderCapabilities(bypass_method=None, sign_in_available=True, discovered_at=time.time())
+	)
+
+	provider_config.sign_in_path = '/api/checkin'
+
+	assert cache.get(provider_config) is None
+
+
+def test_probe_waf_challenge(provider_config):
+	client = mock_client(html_response(WAF_CHALLENGE_PAGE))
+
+	capabilities = probe_provider(provider_config, client)
+
+	assert capabilities.bypass_method == 'waf_cookies'
+	assert capabilities.sign_in_available
+
+
+def test_probe_sign_in_available(provider_config):
+	client = mock_client(httpx.Response(200, json={'success': True}), httpx.Response(401, json={'success': False}))
+
+	capabilities = probe_provider(provider_config, client)
+
+	assert capabilities.bypass_method is None
+	assert capabilities.sign_in_available
+
+
+@pytest.mark.parametrize(
+	'sign_in_response',
+	[httpx.Response(404, json={'message': 'not found'}), html_response('<html>index</html>')],
+	ids=['not-found', 'html'],
+)
+def test_probe_sign_in_unavailable(provider_config, sign_in_response):
+	client = mock_client(httpx.Response(200, json={'success': True}), sign_in_response)
+
+	capabilities = probe_provider(provider_config, client)
+
+	assert capabilities.bypass_method is None
+	assert not capabilities.sign_in_available
+
+
+@pytest.mark.parametrize(
+	'status_response',
+	[html_response('<html>maintenance</html>'), httpx.Response(502, json={'success': False})],
+	ids=['non-json', 'non-200'],
+)
+def test_probe_status_unavailable_keeps_manual_config(tmp_path, provider_config, status_response):
+	provider_config.bypass_method = 'waf_cookies'
+	app_config = AppConfig(providers={provider_config.name: provider_config})
+	client_pool = ClientPool()
+	client_pool.clients[provider_config.name] = mock_client(status_response)
+	cache = CapabilityCache(str(tmp_path / 'provider_cache.json'), ttl=3600)
+
+	assert probe_provider(provider_config, client_pool.clients[provider_config.name]) is None
+
+	asyncio.run(discover_providers(app_config, {provider_config.name}, client_pool, cache))
+
+	assert provider_config.capabilities is None
+	assert provider_config.needs_waf_cookies()
+	assert cache.get(provider_config) is None
+
+
+def test_discover_uses_cache_without_probing(tmp_path, provider_config):
+	app_config = AppConfig(providers={provider_config.name: provider_config})
+	cached = ProviderCapabilities(bypass_method='waf_cookies', sign_in_available=False, discovered_at=time.time())
+	cache = CapabilityCache(str(tmp_path / 'provider_cache.json'), ttl=3600)
+	cache.set(provider_config, cached)
+	calls = []
+	client_pool = ClientPool()
+	client_pool.clients[provider_config.name] = mock_client(httpx.Response(200, json={'success': True}), calls=calls)
+
+	asyncio.run(discover_providers(app_config, {provider_config.name}, client_pool, cache))
+
+	assert calls == []
+	assert provider_config.capabilities == cached
+
+
+def test_discover_probes_and_caches(tmp_path, provider_config):
+	app_config = AppConfig(providers={provider_config.name: provider_config})
+	cache = CapabilityCache(str(tmp_path / 'provider_cache.json'), ttl=3600)
+	client_pool = ClientPool()
+	client_pool.clients[provider_config.name] = mock_client(html_response(WAF_CHALLENGE_PAGE))
+
+	asyncio.run(discover_providers(app_config, {provider_config.name}, client_pool, cache))
+
+	assert provider_config.needs_waf_cookies()
+	assert cache.get(provider_config) == provider_config.capabilities
+	assert (tmp_path / 'provider_cache.json').exists()
@@ -0,0 +1,141 @@
+import sys
+from pathlib import Path
+
+import httpx
+import pytest
+
+# 添加项目根目录到 PATH
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from utils.limiter import LATENCY_WINDOW, SKIP_LIMITER_EXTENSION, AdaptiveLimiter, LimitedTransport, is_throttled
+
+
+@pytest.fixture
+def limiter():
+	return AdaptiveLimiter('anyrouter', initial_limit=2, max_limit=8)
+
+
+def saturate(limiter):
+	for _ in range(limiter.current_limit):
+		limiter.acquire()
+
+
+def test_increase_when_saturated_and_latency_flat(limiter):
+	for _ in range(20):
+		saturate(limiter)
+		for _ in range(limiter.current_limit):
+			limiter.release(0.1)
+
+	assert limiter.current_limit > 2
+	assert limiter.in_flight == 0
+
+
+def test_no_increase_when_not_saturated(limiter):
+	for _ in range(20):
+		limiter.acquire()
+		limiter.release(0.1)
+
+	assert limiter.current_limit == 2
+
+
+def test_backoff_on_throttle(limiter):
+	limiter.limit = 8.0
+	limiter.acquire()
+	limiter.release(0.1, throttled=True)
+
+	assert limiter.current_limit == 4
+	assert limiter.throttled == 1
+
+
+def test_decrease_on_latency_increase(limiter):
+	limiter.limit = 8.0
+	for _ in range(10):
+		limiter.acquire()
+		limiter.release(0.1)
+	for _ in range(5):
+		limiter.acquire()
+		limiter.release(1.0)
+
+	assert limiter.current_limit < 8
+
+
+def run_round(limiter, latency):
+	"""用满并发后以相同延迟释放全部名额"""
+	count = limiter.current_limit
+	saturate(limiter)
+	for _ in range(count):
+		limiter.release(latency)
+
+
+def test_decrease_at_most_once_per_window(limiter):
+	limiter.limit = 8.0
+	for _ in range(10):
+		limiter.acquire()
+		limiter.release(0.1)
+	for _ in range(LATENCY_WINDOW - 1):
+		limiter.acquire()
+		limiter.release(1.0)
+
+	assert limiter.limit == pytest.approx(8.0 * 0.9)
+
+
+def test_limit_recovers_after_latency_shift():
+	limiter = AdaptiveLimiter('anyrouter', initial_limit=2, max_limit=32)
+	for _ in range(60):
+		run_round(limiter, 0.1)
+	limit_before_shift = limiter.limit
+
+	# 延迟稳定在新的水平后，基线跟随上升，上限只下调一次并重新增长
+	limits = []
+	for _ in range(50):
+		run_round(limiter, 0.3)
+		limits.append(limiter.limit)
+
+	assert min(limits) == pytest.approx(limit_before_shift * 0.9, rel=0.05)
+	assert limiter.limit > limit_before_shift
+	assert limiter.baseline_p95 == pytest.approx(0.3, rel=0.1)
+
+
+def test_is_throttled():
+	api_request = httpx.Request('GET', 'https://anyrouter.top/api/user/self')
+
+	assert is_throttled(api_request, httpx.Response(429))
+	assert is_throttled(api_request, httpx.Response(200, headers={'content-type': 'text/html'}))
+	assert not is_throttled(api_request, httpx.Response(200, json={'success': True}))
+
+
+def test_limited_transport_records_throttle(limiter):
+	transport = LimitedTransport(httpx.MockTransport(lambda request: httpx.Response(503)), limiter)
+	with httpx.Client(transport=transport) as client:
+		client.get('https://anyrouter.top/api/user/self')
+
+	assert limiter.throttled == 1
+	assert limiter.in_flight == 0
+
+
+def test_limited_transport_holds_slot_until_body_read(limiter):
+	class BodyStream(httpx.SyncByteStream):
+		def __iter__(self):
+			yield b'{"success": true}'
+
+	def handler(request):
+		return httpx.Response(200, headers={'content-type': 'application/json'}, stream=BodyStream())
+
+	transport = LimitedTransport(httpx.MockTransport(handler), limiter)
+	with httpx.Client(transport=transport) as client:
+		with client.stream('GET', 'https://anyrouter.top/api/user/self') as response:
+			assert limiter.in_flight == 1
+			response.read()
+		assert limiter.in_flight == 0
+
+	assert limiter.requests == 1
+
+
+def test_skip_limiter_extension(limiter):
+	transport = LimitedTransport(httpx.MockTransport(lambda request: httpx.Response(503)), limiter)
+	with httpx.Client(transport=transport) as client:
+		client.head('https://anyrouter.top', extensions={SKIP_LIMITER_EXTENSION: True})
+
+	assert limiter.requests == 0
+	assert limiter.throttled == 0
@@ -0,0 +1,79 @@
+import json
+import logging
+import sys
+from pathlib import Path
+
+import pytest
+
+# 添加项目根目录到 PATH
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from utils.log import JsonFormatter, TextFormatter, get_logger, parse_log_level
+
+
+def make_record(level=logging.INFO, msg='hello', **extra):
+	record = logging.LogRecord('checkin', level, __file__, 1, msg, None, None)
+	for key, value in extra.items():
+		setattr(record, key, value)
+	return record
+
+
+@pytest.mark.parametrize(
+	'value, expected',
+	[
+		(None, logging.INFO),
+		('', logging.INFO),
+		('debug', logging.DEBUG),
+		(' WARN ', logging.WARNING),
+		('warning', logging.WARNING),
+		('FAILED', logging.ERROR),
+		('error', logging.ERROR),
+		('verbose', logging.INFO),
+	],
+)
+def test_parse_log_level(value, expected):
+	assert parse_log_level(value) == expected
+
+
+def test_text_formatter():
+	formatter = TextFormatter()
+
+	assert formatter.format(make_record()) == '[INFO] hello'
+	assert formatter.format(make_record(logging.ERROR)) == '[FAILED] hello'
+	assert formatter.format(make_record(tag='SUCCESS', account='Account 1')) == '[SUCCESS] Account 1: hello'
+	assert formatter.format(make_record(provider='anyrouter')) == '[INFO] anyrouter: hello'
+	# 同时存在时优先显示账号
+	assert formatter.format(make_record(account='Account 1', provider='anyrouter')) == '[INFO] Account 1: hello'
+
+
+def test_json_formatter():
+	formatter = JsonFormatter()
+
+	payload = json.loads(formatter.format(make_record(logging.WARNING)))
+	assert payload['level'] == 'WARNING'
+	assert payload['tag'] == 'WARNING'
+	assert payload['message'] == 'hello'
+	assert 'account' not in payload and 'provider' not in payload
+
+	payload = json.loads(formatter.format(make_record(tag='NETWORK', account='Account 1', provider='anyrouter')))
+	assert payload['tag'] == 'NETWORK'
+	assert payload['account'] == 'Account 1'
+	assert payload['provider'] == 'anyrouter'
+
+
+def test_bind_drops_none_fields():
+	logger = get_logger(account='Account 1', provider=None)
+	assert logger.extra == {'account': 'Account 1'}
+
+	bound = logger.bind(provider='anyrouter', account=None)
+	assert bound.extra == {'account': 'Account 1', 'provider': 'anyrouter'}
+	# bind 不修改原 logger
+	assert logger.extra == {'account': 'Account 1'}
+
+
+def test_tag_passed_as_extra():
+	logger = get_logger(account='Account 1')
+	msg, kwargs = logger.process('hello', {'tag': 'PROCESSING'})
+
+	assert kwargs['extra'] == {'account': 'Account 1', 'tag': 'PROCESSING'}
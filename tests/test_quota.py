@@ -0,0 +1,58 @@
+import sys
+from pathlib import Path
+
+import pytest
+
+# 添加项目根目录到 PATH
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from utils.quota import QuotaHistory, QuotaSample, QuotaThresholds, check_thresholds
+
+
+@pytest.fixture
+def history(tmp_path):
+	history = QuotaHistory(str(tmp_path / 'quota_history.json'))
+	history.add('account_1', QuotaSample(1000, 100.0, 10.0))
+	history.add('account_1', QuotaSample(1900, 97.5, 12.5))
+	history.add('account_1', QuotaSample(2800, 95.0, 15.0))
+	return history
+
+
+def test_delta_encoding_round_trip(history):
+	encoded = QuotaHistory.encode(history.samples['account_1'])
+
+	assert encoded == {'base': [1000, 10000, 1000], 'deltas': [[900, -250, 250], [900, -250, 250]]}
+	assert QuotaHistory.decode(encoded) == history.samples['account_1']
+
+
+def test_save_and_load(history):
+	history.save()
+
+	reloaded = QuotaHistory(history.path)
+	reloaded.load()
+	assert reloaded.samples == history.samples
+
+
+def test_max_samples(tmp_path):
+	history = QuotaHistory(str(tmp_path / 'quota_history.json'), max_samples=2)
+	for i in range(5):
+		history.add('account_1', QuotaSample(i, 100.0, float(i)))
+
+	assert [s.timestamp for s in history.samples['account_1']] == [3, 4]
+
+
+def test_burn_rate(history):
+	# 1800 秒内消耗 $5
+	assert history.burn_rate('account_1', 3600) == pytest.approx(10.0)
+	# 窗口内仅包含最新采样时无法计算
+	assert history.burn_rate('account_1', 60) is None
+
+
+def test_check_thresholds(history):
+	thresholds = QuotaThresholds(burn_rate=5.0, min_balance=96.0)
+
+	alerts = check_thresholds(history, 'account_1', thresholds)
+
+	assert set(alerts) == {'burn_rate', 'min_balance'}
+	assert check_thresholds(history, 'account_1', QuotaThresholds()) == {}
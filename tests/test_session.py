@@ -0,0 +1,41 @@
+import asyncio
+import sys
+from pathlib import Path
+
+# 添加项目根目录到 PATH
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from utils.config import ProviderConfig
+from utils.session import ClientPool, build_cookie_header
+
+
+def test_build_cookie_header():
+	assert build_cookie_header({'session': 'abc', 'acw_tc': 'tc'}) == 'session=abc; acw_tc=tc'
+
+
+def test_blocked_provider_does_not_starve_others():
+	client_pool = ClientPool()
+	slow = ProviderConfig(name='slow', domain='https://slow.example.com')
+	fast = ProviderConfig(name='fast', domain='https://fast.example.com')
+	client_pool.get(slow)
+	limiter = client_pool.limiters['slow']
+	limiter.limit = 1.0
+	limiter.acquire()  # 占满 slow 的并发名额，之后的请求都会在线程中等待
+
+	waiting_count = 40
+
+	async def run():
+		waiting = [asyncio.create_task(client_pool.run(slow, limiter.acquire)) for _ in range(waiting_count)]
+		await asyncio.sleep(0.1)
+		result = await asyncio.wait_for(client_pool.run(fast, lambda: 'ok'), timeout=5)
+
+		for _ in range(waiting_count + 1):
+			limiter.release(None)
+		await asyncio.gather(*waiting)
+		return result
+
+	try:
+		assert asyncio.run(run()) == 'ok'
+	finally:
+		client_pool.close()
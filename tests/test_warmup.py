@@ -0,0 +1,71 @@
+import sys
+from pathlib import Path
+
+import httpx
+import pytest
+
+# 添加项目根目录到 PATH
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from utils import warmup
+from utils.config import ProviderConfig
+from utils.session import ClientPool
+from utils.warmup import warm_up_host
+
+
+@pytest.fixture(autouse=True)
+def no_retry_delay(monkeypatch):
+	monkeypatch.setattr(warmup, 'WARMUP_RETRY_DELAY', 0)
+
+
+def make_pool(provider_config, handler) -> ClientPool:
+	client_pool = ClientPool()
+	client_pool.clients[provider_config.name] = httpx.Client(transport=httpx.MockTransport(handler))
+	return client_pool
+
+
+def failing_handler(failures: int):
+	calls = []
+
+	def handler(request):
+		calls.append(request)
+		if len(calls) <= failures:
+			raise httpx.ConnectError('connection reset', request=request)
+		return httpx.Response(200)
+
+	return handler, calls
+
+
+@pytest.fixture
+def provider_config():
+	return ProviderConfig(name='local', domain='http://localhost:8765')
+
+
+def test_retry_once_after_transient_failure(provider_config):
+	handler, calls = failing_handler(1)
+
+	timing = warm_up_host(provider_config, make_pool(provider_config, handler), timeout=1)
+
+	assert timing.reachable
+	assert timing.attempts == 2
+	assert len(calls) == 2
+
+
+def test_unreachable_after_all_attempts_fail(provider_config):
+	handler, calls = failing_handler(10)
+
+	timing = warm_up_host(provider_config, make_pool(provider_config, handler), timeout=1)
+
+	assert not timing.reachable
+	assert timing.attempts == warmup.WARMUP_ATTEMPTS
+	assert len(calls) == warmup.WARMUP_ATTEMPTS
+	assert 'connection reset' in timing.error
+
+
+def test_any_http_response_is_reachable(provider_config):
+	timing = warm_up_host(provider_config, make_pool(provider_config, lambda request: httpx.Response(403)), timeout=1)
+
+	assert timing.reachable
+	assert timing.attempts == 1
+	assert timing.dns_ms is not None
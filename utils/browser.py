@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+"""
+浏览器模块
+
+使用 Playwright 访问登录页获取 WAF cookies，主进程与浏览器 worker 进程共用。
+"""
+
+import tempfile
+
+from playwright.async_api import async_playwright
+
+from utils.log import get_logger
+
+logger = get_logger()
+
+USER_AGENT = (
+	'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/138.0.0.0 Safari/537.36'
+)
+
+
+async def get_waf_cookies_with_playwright(account_name: str, login_url: str, playwright=None):
+	"""使用 Playwright 获取 WAF cookies（隐私模式）
+
+	传入已启动的 playwright 实例时复用其驱动进程（浏览器 worker 进程中使用）
+	"""
+	if playwright is None:
+		async with async_playwright() as p:
+			return await get_waf_cookies_with_playwright(account_name, login_url, p)
+
+	log = logger.bind(account=account_name)
+	log.info('Starting browser to get WAF cookies...', tag='PROCESSING')
+
+	with tempfile.TemporaryDirectory() as temp_dir:
+		context = await playwright.chromium.launch_persistent_context(
+			user_data_dir=temp_dir,
+			headless=False,
+			user_agent=USER_AGENT,
+			viewport={'width': 1920, 'height': 1080},
+			args=[
+				'--disable-blink-features=AutomationControlled',
+				'--disable-dev-shm-usage',
+				'--disable-web-security',
+				'--disable-features=VizDisplayCompositor',
+				'--no-sandbox',
+			],
+		)
+
+		page = await context.new_page()
+
+		try:
+			log.info('Access login page to get initial cookies...', tag='PROCESSING')
+
+			await page.goto(login_url, wait_until='networkidle')
+
+			try:
+				await page.wait_for_function('document.readyState === "complete"', timeout=5000)
+			except Exception:
+				await page.wait_for_timeout(3000)
+
+			cookies = await page.context.cookies()
+
+			waf_cookies = {}
+			for cookie in cookies:
+				cookie_name = cookie.get('name')
+				cookie_value = cookie.get('value')
+				if cookie_name in ['acw_tc', 'cdn_sec_tc', 'acw_sc__v2'] and cookie_value is not None:
+					waf_cookies[cookie_name] = cookie_value
+
+			log.info(f'Got {len(waf_cookies)} WAF cookies')
+
+			required_cookies = ['acw_tc', 'cdn_sec_tc', 'acw_sc__v2']
+			missing_cookies = [c for c in required_cookies if c not in waf_cookies]
+
+			if missing_cookies:
+				log.error(f'Missing WAF cookies: {missing_cookies}')
+				await context.close()
+				return None
+
+			log.info('Successfully got all WAF cookies', tag='SUCCESS')
+
+			await context.close()
+
+			return waf_cookies
+
+		except Exception as e:
+			log.error(f'Error occurred while getting WAF cookies: {e}')
+			await context.close()
+			return None
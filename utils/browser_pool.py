@@ -0,0 +1,171 @@
+#!/usr/bin/env python3
+"""
+浏览器 worker 进程池
+
+单进程驱动多个 Playwright 页面时受限于单核上的驱动开销，开启后 WAF cookies 的获取会分发到多个
+worker 进程执行。每个 worker 持有自己的事件循环与 Playwright 驱动，结果通过进程池管道返回主事件循环；
+任务只提交给空闲的 worker，超时只计算执行时间；worker 崩溃或超时时只结束该 worker 进程，替换后重试。
+
+环境变量:
+- BROWSER_WORKERS: worker 进程数，默认 0（在主进程中获取 WAF cookies）
+- BROWSER_TASK_TIMEOUT: 单次获取 WAF cookies 的超时时间（秒），默认 120
+"""
+
+import asyncio
+import atexit
+import multiprocessing
+import os
+from collections.abc import Callable
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+from utils.browser import get_waf_cookies_with_playwright
+from utils.log import get_logger, setup_logging
+
+logger = get_logger()
+
+MAX_ATTEMPTS = 2
+DEFAULT_TASK_TIMEOUT = 120.0
+SHUTDOWN_TIMEOUT = 10.0  # 关闭时等待 worker 正常退出的时间，超时后强制结束
+
+# worker 进程内的全局状态
+_worker_loop: asyncio.AbstractEventLoop | None = None
+_worker_playwright = None
+
+
+def get_browser_workers() -> int:
+	"""获取 worker 进程数"""
+	try:
+		return max(0, int(os.getenv('BROWSER_WORKERS', '0')))
+	except ValueError:
+		logger.warning('BROWSER_WORKERS must be an integer, browser workers disabled')
+		return 0
+
+
+def get_browser_task_timeout() -> float:
+	"""获取单次任务超时时间"""
+	try:
+		return float(os.getenv('BROWSER_TASK_TIMEOUT', DEFAULT_TASK_TIMEOUT))
+	except ValueError:
+		logger.warning(f'BROWSER_TASK_TIMEOUT must be a number, using default {DEFAULT_TASK_TIMEOUT}')
+		return DEFAULT_TASK_TIMEOUT
+
+
+def _init_worker():
+	"""worker 进程初始化：配置日志并启动 Playwright 驱动"""
+	global _worker_loop, _worker_playwright
+	from playwright.async_api import async_playwright
+
+	setup_logging()
+	_worker_loop = asyncio.new_event_loop()
+	_worker_playwright = _worker_loop.run_until_complete(async_playwright().start())
+	atexit.register(_shutdown_worker)
+
+
+def _shutdown_worker():
+	"""worker 进程退出时停止 Playwright 驱动"""
+	try:
+		_worker_loop.run_until_complete(_worker_playwright.stop())
+		_worker_loop.close()
+	except Exception:
+		pass
+
+
+def _acquire_waf_cookies(account_name: str, login_url: str) -> dict | None:
+	"""在 worker 进程中获取 WAF cookies"""
+	return _worker_loop.run_until_complete(
+		get_waf_cookies_with_playwright(account_name, login_url, playwright=_worker_playwright)
+	)
+
+
+def _terminate_workers(executor: ProcessPoolExecutor):
+	"""强制结束进程池中的 worker 进程（ProcessPoolExecutor 未提供公开接口）"""
+	for process in list((executor._processes or {}).values()):
+		if process.is_alive():
+			process.terminate()
+
+
+class BrowserWorkerPool:
+	"""获取 WAF cookies 的 worker 进程池
+
+	每个 worker 是一个单进程的 ProcessPoolExecutor，任务只提交给空闲的 worker，超时只计算执行时间；
+	结束卡住或崩溃的 worker 时不影响其他 worker 上正在执行的任务。
+	task 与 initializer 必须是可被 spawn 子进程导入的模块级函数，默认使用 Playwright 实现。
+	"""
+
+	def __init__(
+		self,
+		workers: int,
+		task_timeout: float | None = None,
+		task: Callable[[str, str], dict | None] = _acquire_waf_cookies,
+		initializer: Callable[[], None] = _init_worker,
+	):
+		self.workers = workers
+		self.task_timeout = task_timeout or get_browser_task_timeout()
+		self.task = task
+		self.initializer = initializer
+		self.restarts = 0
+		self.executors = {self._create_executor() for _ in range(workers)}
+		self.idle: asyncio.Queue[ProcessPoolExecutor] = asyncio.Queue()
+		for executor in self.executors:
+			self.idle.put_nowait(executor)
+
+	def _create_executor(self) -> ProcessPoolExecutor:
+		# 统一使用 spawn，避免 fork 继承日志线程与 Playwright 状态，并与 Windows 行为一致
+		return ProcessPoolExecutor(
+			max_workers=1,
+			mp_context=multiprocessing.get_context('spawn'),
+			initializer=self.initializer,
+		)
+
+	def _restart(self, executor: ProcessPoolExecutor) -> ProcessPoolExecutor:
+		"""结束单个 worker 并用新进程替换"""
+		_terminate_workers(executor)
+		executor.shutdown(wait=False, cancel_futures=True)
+		self.executors.discard(executor)
+		self.restarts += 1
+		replacement = self._create_executor()
+		self.executors.add(replacement)
+		return replacement
+
+	async def get_waf_cookies(self, account_name: str, login_url: str) -> dict | None:
+		"""在空闲的 worker 进程中获取 WAF cookies"""
+		log = logger.bind(account=account_name)
+		loop = asyncio.get_running_loop()
+
+		for attempt in range(1, MAX_ATTEMPTS + 1):
+			executor = await self.idle.get()
+			try:
+				return await asyncio.wait_for(
+					loop.run_in_executor(executor, self.task, account_name, login_url), self.task_timeout
+				)
+			except BrokenProcessPool:
+				log.warning(f'Browser worker crashed (attempt {attempt}/{MAX_ATTEMPTS}), restarting worker')
+				executor = self._restart(executor)
+			except asyncio.TimeoutError:
+				# 卡住的 worker 无法取消，只能结束进程
+				log.warning(
+					f'Browser worker timed out after {self.task_timeout:.0f}s '
+					f'(attempt {attempt}/{MAX_ATTEMPTS}), restarting worker'
+				)
+				executor = self._restart(executor)
+			except asyncio.CancelledError:
+				# 调用方取消时 worker 仍在执行，替换后再归还
+				executor = self._restart(executor)
+				raise
+			finally:
+				self.idle.put_nowait(executor)
+
+		log.error('Browser worker failed repeatedly, giving up')
+		return None
+
+	def shutdown(self):
+		"""关闭所有 worker，未能按时退出时强制结束"""
+		processes = []
+		for executor in self.executors:
+			processes.extend((executor._processes or {}).values())
+			executor.shutdown(wait=False, cancel_futures=True)
+		for process in processes:
+			process.join(SHUTDOWN_TIMEOUT)
+			if process.is_alive():
+				process.terminate()
@@ -5,9 +5,44 @@
 
 import json
 import os
+import time
 from dataclasses import dataclass
 from typing import Dict, Literal
 
+from utils.log import get_logger
+
+logger = get_logger()
+
+
+@dataclass
+class ProviderCapabilities:
+	"""自动探测得到的 Provider 能力"""
+
+	bypass_method: Literal['waf_cookies'] | None
+	sign_in_available: bool
+	discovered_at: float
+
+	@classmethod
+	def from_dict(cls, data: dict) -> 'ProviderCapabilities':
+		"""从缓存字典创建 ProviderCapabilities"""
+		return cls(
+			bypass_method=data.get('bypass_method'),
+			sign_in_available=bool(data.get('sign_in_available')),
+			discovered_at=float(data['discovered_at']),
+		)
+
+	def to_dict(self) -> dict:
+		"""转换为可写入缓存的字典"""
+		return {
+			'bypass_method': self.bypass_method,
+			'sign_in_available': self.sign_in_available,
+			'discovered_at': self.discovered_at,
+		}
+
+	def is_expired(self, ttl: float) -> bool:
+		"""判断缓存是否已过期"""
+		return time.time() - self.discovered_at > ttl
+
 
 @dataclass
 class ProviderConfig:
@@ -20,6 +55,8 @@ class ProviderConfig:
 	user_info_path: str = '/api/user/self'
 	api_user_key: str = 'new-api-user'
 	bypass_method: Literal['waf_cookies'] | None = None
+	discover: bool = False
+	capabilities: ProviderCapabilities | None = None
 
 	@classmethod
 	def from_dict(cls, name: str, data: dict) -> 'ProviderConfig':
@@ -28,6 +65,7 @@ class ProviderConfig:
 		配置格式:
 		- 基础: {"domain": "https://example.com"}
 		- 完整: {"domain": "https://example.com", "login_path": "/login", "api_user_key": "x-api-user", "bypass_method": "waf_cookies", ...}
+		- 自动探测: {"domain": "https://example.com", "discover": true}
 		"""
 		return cls(
 			name=name,
@@ -37,14 +75,19 @@ class ProviderConfig:
 			user_info_path=data.get('user_info_path', '/api/user/self'),
 			api_user_key=data.get('api_user_key', 'new-api-user'),
 			bypass_method=data.get('bypass_method'),
+			discover=bool(data.get('discover', False)),
 		)
 
 	def needs_waf_cookies(self) -> bool:
 		"""判断是否需要获取 WAF cookies"""
+		if self.capabilities:
+			return self.capabilities.bypass_method == 'waf_cookies'
 		return self.bypass_method == 'waf_cookies'
 
 	def needs_manual_check_in(self) -> bool:
 		"""判断是否需要手动调用签到接口"""
+		if self.capabilities:
+			return self.capabilities.sign_in_available and self.sign_in_path is not None
 		return self.bypass_method == 'waf_cookies'
 
 
@@ -85,7 +128,7 @@ class AppConfig:
 				providers_data = json.loads(providers_str)
 
 				if not isinstance(providers_data, dict):
-					print('[WARNING] PROVIDERS must be a JSON object, ignoring custom providers')
+					logger.warning('PROVIDERS must be a JSON object, ignoring custom providers')
 					return cls(providers=providers)
 
 				# 解析自定义 providers,会覆盖默认配置
@@ -93,16 +136,14 @@ class AppConfig:
 					try:
 						providers[name] = ProviderConfig.from_dict(name, provider_data)
 					except Exception as e:
-						print(f'[WARNING] Failed to parse provider "{name}": {e}, skipping')
+						logger.warning(f'Failed to parse provider "{name}": {e}, skipping')
 						continue
 
-				print(f'[INFO] Loaded {len(providers_data)} custom provider(s) from PROVIDERS environment variable')
+				logger.info(f'Loaded {len(providers_data)} custom provider(s) from PROVIDERS environment variable')
 			except json.JSONDecodeError as e:
-				print(
-					f'[WARNING] Failed to parse PROVIDERS environment variable: {e}, using default configuration only'
-				)
+				logger.warning(f'Failed to parse PROVIDERS environment variable: {e}, using default configuration only')
 			except Exception as e:
-				print(f'[WARNING] Error loading PROVIDERS: {e}, using default configuration only')
+				logger.warning(f'Error loading PROVIDERS: {e}, using default configuration only')
 
 		return cls(providers=providers)
 
@@ -137,33 +178,33 @@ def load_accounts_config() -> list[AccountConfig] | None:
 	"""从环境变量加载账号配置"""
 	accounts_str = os.getenv('ANYROUTER_ACCOUNTS')
 	if not accounts_str:
-		print('ERROR: ANYROUTER_ACCOUNTS environment variable not found')
+		logger.error('ANYROUTER_ACCOUNTS environment variable not found', tag='ERROR')
 		return None
 
 	try:
 		accounts_data = json.loads(accounts_str)
 
 		if not isinstance(accounts_data, list):
-			print('ERROR: Account configuration must use array format [{}]')
+			logger.error('Account configuration must use array format [{}]', tag='ERROR')
 			return None
 
 		accounts = []
 		for i, account_dict in enumerate(accounts_data):
 			if not isinstance(account_dict, dict):
-				print(f'ERROR: Account {i + 1} configuration format is incorrect')
+				logger.error(f'Account {i + 1} configuration format is incorrect', tag='ERROR')
 				return None
 
 			if 'cookies' not in account_dict or 'api_user' not in account_dict:
-				print(f'ERROR: Account {i + 1} missing required fields (cookies, api_user)')
+				logger.error(f'Account {i + 1} missing required fields (cookies, api_user)', tag='ERROR')
 				return None
 
 			if 'name' in account_dict and not account_dict['name']:
-				print(f'ERROR: Account {i + 1} name field cannot be empty')
+				logger.error(f'Account {i + 1} name field cannot be empty', tag='ERROR')
 				return None
 
 			accounts.append(AccountConfig.from_dict(account_dict, i))
 
 		return accounts
 	except Exception as e:
-		print(f'ERROR: Account configuration format is incorrect: {e}')
+		logger.error(f'Account configuration format is incorrect: {e}', tag='ERROR')
 		return None
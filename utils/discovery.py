@@ -0,0 +1,213 @@
+#!/usr/bin/env python3
+"""
+Provider 能力自动探测模块
+
+对开启 discover 的 provider 探测一次状态接口、WAF 挑战与签到接口，结果写入磁盘缓存，
+在 TTL 内复用，避免每个账号都浪费一次浏览器启动或签到请求。
+
+环境变量:
+- PROVIDER_DISCOVERY_TTL: 探测结果缓存有效期（秒），默认 86400
+"""
+
+import asyncio
+import json
+import os
+import time
+
+import httpx
+
+from utils.browser import USER_AGENT
+from utils.config import AppConfig, ProviderCapabilities, ProviderConfig
+from utils.limiter import SKIP_LIMITER_EXTENSION
+from utils.log import get_logger
+from utils.session import ClientPool
+
+logger = get_logger()
+
+DISCOVERY_CACHE_FILE = 'provider_cache.json'
+DEFAULT_DISCOVERY_TTL = 24 * 3600
+DISCOVERY_TIMEOUT = 15.0
+STATUS_PATH = '/api/status'
+
+# 阿里云 WAF 挑战页特征：返回 HTML，通过脚本计算 acw_sc__v2 cookie
+WAF_CHALLENGE_MARKERS = ('acw_sc__v2', 'arg1=')
+
+
+def get_discovery_ttl() -> float:
+	"""获取探测缓存有效期"""
+	try:
+		return float(os.getenv('PROVIDER_DISCOVERY_TTL', DEFAULT_DISCOVERY_TTL))
+	except ValueError:
+		return DEFAULT_DISCOVERY_TTL
+
+
+def is_waf_challenge(response: httpx.Response) -> bool:
+	"""判断响应是否为 WAF 挑战页"""
+	if 'application/json' in response.headers.get('content-type', ''):
+		return False
+	text = response.text[:4096]
+	return any(marker in text for marker in WAF_CHALLENGE_MARKERS)
+
+
+def is_json_response(response: httpx.Response) -> bool:
+	"""判断响应是否为 JSON"""
+	try:
+		response.json()
+		return True
+	except ValueError:
+		return False
+
+
+class CapabilityCache:
+	"""Provider 能力磁盘缓存，按 provider 名称、域名及探测相关路径索引"""
+
+	def __init__(self, path: str = DISCOVERY_CACHE_FILE, ttl: float | None = None):
+		self.path = path
+		self.ttl = get_discovery_ttl() if ttl is None else ttl
+		self.entries: dict[str, dict] = {}
+		self.dirty = False
+
+	@staticmethod
+	def cache_key(provider_config: ProviderConfig) -> str:
+		# 路径变化后探测结果不再适用，需重新探测
+		return '|'.join(
+			[
+				f'{provider_config.name}@{provider_config.domain}',
+				provider_config.login_path,
+				provider_config.sign_in_path or '',
+			]
+		)
+
+	def load(self):
+		"""加载缓存文件"""
+		try:
+			if os.path.exists(self.path):
+				with open(self.path, 'r', encoding='utf-8') as f:
+					data = json.load(f)
+				if isinstance(data, dict):
+					self.entries = data
+		except Exception as e:
+			logger.warning(f'Failed to load provider discovery cache: {e}')
+
+	def save(self):
+		"""保存缓存文件（仅在有更新时写入）"""
+		if not self.dirty:
+			return
+		try:
+			with open(self.path, 'w', encoding='utf-8') as f:
+				json.dump(self.entries, f, ensure_ascii=False, indent=2)
+			self.dirty = False
+		except Exception as e:
+			logger.warning(f'Failed to save provider discovery cache: {e}')
+
+	def get(self, provider_config: ProviderConfig) -> ProviderCapabilities | None:
+		"""获取未过期的缓存能力"""
+		entry = self.entries.get(self.cache_key(provider_config))
+		if not entry:
+			return None
+		try:
+			capabilities = ProviderCapabilities.from_dict(entry)
+		except Exception:
+			return None
+		if capabilities.is_expired(self.ttl):
+			return None
+		return capabilities
+
+	def set(self, provider_config: ProviderConfig, capabilities: ProviderCapabilities):
+		self.entries[self.cache_key(provider_config)] = capabilities.to_dict()
+		self.dirty = True
+
+
+def probe_provider(provider_config: ProviderConfig, client: httpx.Client) -> ProviderCapabilities | None:
+	"""探测 provider 能力，探测失败时返回 None（沿用手动配置）"""
+	log = logger.bind(provider=provider_config.name)
+	headers = {'User-Agent': USER_AGENT, 'Accept': 'application/json, text/plain, */*'}
+	# 探测请求不计入并发限制器
+	extensions = {SKIP_LIMITER_EXTENSION: True}
+
+	try:
+		status_response = client.get(
+			f'{provider_config.domain}{STATUS_PATH}',
+			headers=headers,
+			timeout=DISCOVERY_TIMEOUT,
+			extensions=extensions,
+		)
+
+		if is_waf_challenge(status_response):
+			# WAF 拦截下无法直接探测签到接口，沿用配置中的签到路径
+			log.info('WAF challenge detected on status endpoint', tag='DISCOVERY')
+			return ProviderCapabilities(
+				bypass_method='waf_cookies',
+				sign_in_available=provider_config.sign_in_path is not None,
+				discovered_at=time.time(),
+			)
+
+		if status_response.status_code != 200 or not is_json_response(status_response):
+			log.warning(f'Status endpoint unavailable (HTTP {status_response.status_code}), skipping discovery')
+			return None
+
+		sign_in_available = False
+		if provider_config.sign_in_path:
+			# 未携带身份信息，仅用于判断签到接口是否存在
+			sign_in_response = client.post(
+				f'{provider_config.domain}{provider_config.sign_in_path}',
+				headers=headers,
+				timeout=DISCOVERY_TIMEOUT,
+				extensions=extensions,
+			)
+			sign_in_available = sign_in_response.status_code != 404 and is_json_response(sign_in_response)
+
+		return ProviderCapabilities(bypass_method=None, sign_in_available=sign_in_available, discovered_at=time.time())
+	except Exception as e:
+		log.warning(f'Provider discovery failed: {str(e)[:50]}...')
+		return None
+
+
+async def discover_providers(
+	app_config: AppConfig,
+	provider_names: set[str],
+	client_pool: ClientPool,
+	cache: CapabilityCache | None = None,
+):
+	"""为开启 discover 的 provider 填充能力信息，优先使用缓存，未命中的 provider 通过共享连接池并行探测"""
+	targets = [
+		provider
+		for name in sorted(provider_names)
+		if (provider := app_config.get_provider(name)) is not None and provider.discover
+	]
+	if not targets:
+		return
+
+	if cache is None:
+		cache = CapabilityCache()
+		cache.load()
+
+	cached = {provider_config.name: cache.get(provider_config) for provider_config in targets}
+	to_probe = [provider_config for provider_config in targets if not cached[provider_config.name]]
+	probed = await asyncio.gather(
+		*(
+			asyncio.to_thread(probe_provider, provider_config, client_pool.get(provider_config))
+			for provider_config in to_probe
+		)
+	)
+	for provider_config, capabilities in zip(to_probe, probed):
+		if capabilities:
+			cache.set(provider_config, capabilities)
+
+	for provider_config in targets:
+		log = logger.bind(provider=provider_config.name)
+		capabilities = cached[provider_config.name]
+		if capabilities:
+			log.info('Using cached capabilities', tag='DISCOVERY')
+		else:
+			capabilities = cache.get(provider_config)
+			if not capabilities:
+				continue
+
+		provider_config.capabilities = capabilities
+		log.info(
+			f'bypass_method={capabilities.bypass_method}, sign_in_available={capabilities.sign_in_available}',
+			tag='DISCOVERY',
+		)
+
+	cache.save()
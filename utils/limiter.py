@@ -0,0 +1,212 @@
+#!/usr/bin/env python3
+"""
+自适应并发控制模块
+
+每个 provider 的请求经过一个 AIMD 限制器：在并发已用满且 p95 延迟保持平稳时缓慢增加并发上限，
+延迟明显上升时小幅下调（每个采样窗口最多一次），遇到 429/503、超时或 WAF 挑战页时大幅回退。
+延迟基线会缓慢跟随 p95 上升，延迟稳定在新的水平后上限可以重新增长。
+请求延迟从发出请求计算到响应体读取完毕；预热与探测请求可通过 SKIP_LIMITER_EXTENSION 绕过限制器。
+
+环境变量:
+- PROVIDER_CONCURRENCY_INITIAL: 初始并发上限，默认 2
+- PROVIDER_CONCURRENCY_MAX: 并发上限的最大值，默认 16
+"""
+
+import math
+import os
+import threading
+import time
+from collections import deque
+
+import httpx
+
+from utils.log import get_logger
+
+logger = get_logger()
+
+DEFAULT_INITIAL_LIMIT = 2
+DEFAULT_MAX_LIMIT = 16
+
+THROTTLE_STATUS_CODES = (429, 503)
+
+LATENCY_WINDOW = 20  # 计算 p95 的采样数，也是两次延迟下调之间至少间隔的请求数
+MIN_LATENCY_SAMPLES = 5  # 采样不足时只做加性增长
+LATENCY_TOLERANCE = 1.5  # p95 超过基线的倍数视为延迟上升
+LATENCY_DECREASE = 0.9  # 延迟上升时的乘性下调系数
+THROTTLE_BACKOFF = 0.5  # 被限流时的乘性回退系数
+BASELINE_DRIFT = 0.05  # p95 高于基线时，基线每次向 p95 靠拢的比例
+
+# 请求 extensions 中设置该键时不经过限制器，也不计入统计
+SKIP_LIMITER_EXTENSION = 'skip_limiter'
+
+
+def _env_int(name: str, default: int) -> int:
+	try:
+		return max(1, int(os.getenv(name, default)))
+	except ValueError:
+		logger.warning(f'{name} must be an integer, using default {default}')
+		return default
+
+
+def percentile(values, ratio: float) -> float:
+	"""计算分位数（最近秩法）"""
+	ordered = sorted(values)
+	index = max(0, math.ceil(ratio * len(ordered)) - 1)
+	return ordered[index]
+
+
+class AdaptiveLimiter:
+	"""基于延迟与限流信号的 AIMD 并发限制器（线程安全）"""
+
+	def __init__(self, name: str, initial_limit: int | None = None, max_limit: int | None = None, min_limit: int = 1):
+		self.name = name
+		self.min_limit = min_limit
+		self.max_limit = max_limit or _env_int('PROVIDER_CONCURRENCY_MAX', DEFAULT_MAX_LIMIT)
+		initial = initial_limit or _env_int('PROVIDER_CONCURRENCY_INITIAL', DEFAULT_INITIAL_LIMIT)
+		self.limit = float(min(max(initial, min_limit), self.max_limit))
+		self.peak_limit = self.limit
+		self.in_flight = 0
+		self.latencies: deque[float] = deque(maxlen=LATENCY_WINDOW)
+		self.baseline_p95: float | None = None
+		self.releases_since_decrease = LATENCY_WINDOW
+		self.requests = 0
+		self.throttled = 0
+		self.condition = threading.Condition()
+
+	@property
+	def current_limit(self) -> int:
+		return max(self.min_limit, int(self.limit))
+
+	def acquire(self):
+		"""等待可用的并发名额"""
+		with self.condition:
+			while self.in_flight >= self.current_limit:
+				self.condition.wait()
+			self.in_flight += 1
+
+	def release(self, latency: float | None, throttled: bool = False):
+		"""释放并发名额并根据本次请求结果调整上限，latency 为 None 时不参与调整"""
+		with self.condition:
+			saturated = self.in_flight >= self.current_limit
+			self.in_flight -= 1
+			self.requests += 1
+
+			if throttled:
+				self.throttled += 1
+				self.limit = max(self.min_limit, self.limit * THROTTLE_BACKOFF)
+				# 回退后重新建立延迟基线
+				self.latencies.clear()
+				self.baseline_p95 = None
+				self.releases_since_decrease = 0
+			elif latency is not None:
+				self.latencies.append(latency)
+				self._adjust(saturated)
+
+			self.condition.notify_all()
+
+	def _adjust(self, saturated: bool):
+		self.releases_since_decrease += 1
+		if len(self.latencies) >= MIN_LATENCY_SAMPLES:
+			p95 = percentile(self.latencies, 0.95)
+			if self.baseline_p95 is None or p95 < self.baseline_p95:
+				self.baseline_p95 = p95
+			else:
+				# 基线缓慢跟随 p95 上升，延迟稳定在新的水平后不再持续下调
+				self.baseline_p95 += BASELINE_DRIFT * (p95 - self.baseline_p95)
+			if p95 > self.baseline_p95 * LATENCY_TOLERANCE:
+				# 窗口内的高延迟采样来自同一次上升，每个窗口最多下调一次
+				if self.releases_since_decrease >= LATENCY_WINDOW:
+					self.limit = max(self.min_limit, self.limit * LATENCY_DECREASE)
+					self.releases_since_decrease = 0
+				return
+
+		# 只有并发已用满时才增长，避免请求量不足时上限虚高
+		if saturated:
+			self.limit = min(self.max_limit, self.limit + 1 / self.limit)
+			self.peak_limit = max(self.peak_limit, self.limit)
+
+	def snapshot(self) -> dict:
+		"""当前状态，用于运行报告"""
+		with self.condition:
+			p95 = percentile(self.latencies, 0.95) if self.latencies else None
+			return {
+				'limit': self.current_limit,
+				'peak_limit': int(self.peak_limit),
+				'requests': self.requests,
+				'throttled': self.throttled,
+				'p95_ms': round(p95 * 1000, 1) if p95 is not None else None,
+			}
+
+
+def is_throttled(request: httpx.Request, response: httpx.Response) -> bool:
+	"""判断响应是否为限流或 WAF 挑战"""
+	if response.status_code in THROTTLE_STATUS_CODES:
+		return True
+	# API 接口返回 HTML 说明请求被 WAF 拦截
+	return request.url.path.startswith('/api/') and 'text/html' in response.headers.get('content-type', '')
+
+
+class LimitedStream(httpx.SyncByteStream):
+	"""包装响应体，在读取完毕或关闭时释放并发名额"""
+
+	def __init__(self, stream: httpx.SyncByteStream, limiter: AdaptiveLimiter, start: float, throttled: bool):
+		self.stream = stream
+		self.limiter = limiter
+		self.start = start
+		self.throttled = throttled
+		self.timed_out = False
+		self.released = False
+
+	def __iter__(self):
+		try:
+			yield from self.stream
+		except httpx.TimeoutException:
+			self.timed_out = True
+			raise
+
+	def close(self):
+		try:
+			self.stream.close()
+		finally:
+			if not self.released:
+				self.released = True
+				if self.timed_out:
+					self.limiter.release(None, throttled=True)
+				else:
+					self.limiter.release(time.perf_counter() - self.start, self.throttled)
+
+
+class LimitedTransport(httpx.BaseTransport):
+	"""经过自适应限制器的 httpx transport
+
+	并发名额在响应关闭时释放，延迟包含响应体下载时间。
+	"""
+
+	def __init__(self, transport: httpx.BaseTransport, limiter: AdaptiveLimiter):
+		self.transport = transport
+		self.limiter = limiter
+
+	def handle_request(self, request: httpx.Request) -> httpx.Response:
+		if request.extensions.get(SKIP_LIMITER_EXTENSION):
+			return self.transport.handle_request(request)
+
+		self.limiter.acquire()
+		start = time.perf_counter()
+		try:
+			response = self.transport.handle_request(request)
+		except httpx.TimeoutException:
+			self.limiter.release(None, throttled=True)
+			raise
+		except Exception:
+			self.limiter.release(None)
+			raise
+		throttled = is_throttled(request, response)
+		if response.is_closed:
+			# 响应体已在内层 transport 中读取完毕
+			self.limiter.release(time.perf_counter() - start, throttled)
+		else:
+			response.stream = LimitedStream(response.stream, self.limiter, start, throttled)
+		return response
+
+	def close(self):
+		self.transport.close()
@@ -0,0 +1,142 @@
+#!/usr/bin/env python3
+"""
+日志模块
+
+基于队列的非阻塞日志输出，支持 account/provider 上下文字段，可输出可读文本或 JSON lines。
+
+环境变量:
+- LOG_LEVEL: 日志级别，DEBUG / INFO / WARNING(WARN) / ERROR(FAILED)，默认 INFO
+- LOG_FORMAT: 输出格式，text 或 json，默认 text
+"""
+
+import atexit
+import json
+import logging
+import os
+import queue
+import sys
+from datetime import datetime
+from logging.handlers import QueueHandler, QueueListener
+
+LOGGER_NAME = 'checkin'
+
+# 未显式指定 tag 时，按日志级别推断输出前缀
+LEVEL_TAGS = {
+	logging.DEBUG: 'DEBUG',
+	logging.INFO: 'INFO',
+	logging.WARNING: 'WARNING',
+	logging.ERROR: 'FAILED',
+	logging.CRITICAL: 'FAILED',
+}
+
+LEVEL_ALIASES = {
+	'DEBUG': logging.DEBUG,
+	'INFO': logging.INFO,
+	'WARN': logging.WARNING,
+	'WARNING': logging.WARNING,
+	'ERROR': logging.ERROR,
+	'FAILED': logging.ERROR,
+	'CRITICAL': logging.CRITICAL,
+}
+
+CONTEXT_FIELDS = ('account', 'provider')
+
+_listener: QueueListener | None = None
+
+
+def _record_tag(record: logging.LogRecord) -> str:
+	return getattr(record, 'tag', None) or LEVEL_TAGS.get(record.levelno, record.levelname)
+
+
+class TextFormatter(logging.Formatter):
+	"""可读文本格式: [TAG] account: message（无账号时显示 provider）"""
+
+	def format(self, record: logging.LogRecord) -> str:
+		message = record.getMessage()
+		subject = getattr(record, 'account', None) or getattr(record, 'provider', None)
+		if subject:
+			message = f'{subject}: {message}'
+		return f'[{_record_tag(record)}] {message}'
+
+
+class JsonFormatter(logging.Formatter):
+	"""JSON lines 格式，每条日志一行"""
+
+	def format(self, record: logging.LogRecord) -> str:
+		payload = {
+			'time': datetime.fromtimestamp(record.created).isoformat(timespec='milliseconds'),
+			'level': record.levelname,
+			'tag': _record_tag(record),
+		}
+		for field in CONTEXT_FIELDS:
+			value = getattr(record, field, None)
+			if value is not None:
+				payload[field] = value
+		payload['message'] = record.getMessage()
+		return json.dumps(payload, ensure_ascii=False)
+
+
+class ContextLogger(logging.LoggerAdapter):
+	"""携带 account/provider 上下文字段的 logger
+
+	用法: logger.info('message', tag='PROCESSING')
+	"""
+
+	def process(self, msg, kwargs):
+		extra = {**(self.extra or {}), **kwargs.pop('extra', {})}
+		tag = kwargs.pop('tag', None)
+		if tag:
+			extra['tag'] = tag
+		kwargs['extra'] = extra
+		return msg, kwargs
+
+	def bind(self, **fields) -> 'ContextLogger':
+		"""返回附加了额外上下文字段的新 logger"""
+		context = {**(self.extra or {}), **{k: v for k, v in fields.items() if v is not None}}
+		return ContextLogger(self.logger, context)
+
+
+def get_logger(account: str | None = None, provider: str | None = None) -> ContextLogger:
+	"""获取 logger，可绑定账号与 provider 上下文"""
+	return ContextLogger(logging.getLogger(LOGGER_NAME), {}).bind(account=account, provider=provider)
+
+
+def parse_log_level(value: str | None) -> int:
+	"""解析日志级别，无法识别时回退到 INFO"""
+	if not value:
+		return logging.INFO
+	return LEVEL_ALIASES.get(value.strip().upper(), logging.INFO)
+
+
+def setup_logging(level: str | None = None, fmt: str | None = None):
+	"""配置日志输出
+
+	日志记录只入队，由后台线程写入 stdout，避免慢速控制台阻塞签到流程。重复调用不会重复配置。
+	"""
+	global _listener
+	if _listener is not None:
+		return
+
+	log_format = (fmt or os.getenv('LOG_FORMAT', 'text')).strip().lower()
+	stream_handler = logging.StreamHandler(sys.stdout)
+	stream_handler.setFormatter(JsonFormatter() if log_format == 'json' else TextFormatter())
+
+	log_queue = queue.SimpleQueue()
+	logger = logging.getLogger(LOGGER_NAME)
+	logger.handlers.clear()
+	logger.addHandler(QueueHandler(log_queue))
+	logger.setLevel(parse_log_level(level or os.getenv('LOG_LEVEL')))
+	logger.propagate = False
+
+	_listener = QueueListener(log_queue, stream_handler)
+	_listener.start()
+	atexit.register(shutdown_logging)
+
+
+def shutdown_logging():
+	"""停止后台线程并输出队列中剩余的日志"""
+	global _listener
+	if _listener is None:
+		return
+	_listener.stop()
+	_listener = None
@@ -5,6 +5,10 @@ from typing import Literal
 
 import httpx
 
+from utils.log import get_logger
+
+logger = get_logger()
+
 
 class NotificationKit:
 	def __init__(self):
@@ -106,9 +110,9 @@ class NotificationKit:
 		for name, func in notifications:
 			try:
 				func()
-				print(f'[{name}]: Message push successful!')
+				logger.info('Message push successful!', tag=name)
 			except Exception as e:
-				print(f'[{name}]: Message push failed! Reason: {str(e)}')
+				logger.warning(f'Message push failed! Reason: {str(e)}', tag=name)
 
 
 notify = NotificationKit()
@@ -0,0 +1,163 @@
+#!/usr/bin/env python3
+"""
+余额采样与告警模块
+
+采样按账号使用增量编码存储：首个采样保存绝对值，后续采样只保存与前一个采样的差值，
+金额以美分整数保存，便于高频轮询时保持文件紧凑。
+
+环境变量:
+- QUOTA_ALERT_BURN_RATE: 消耗速率告警阈值（美元/小时），不设置则不告警
+- QUOTA_ALERT_MIN_BALANCE: 剩余余额告警阈值（美元），不设置则不告警
+- QUOTA_BURN_WINDOW: 计算消耗速率的时间窗口（秒），默认 3600
+"""
+
+import json
+import os
+from dataclasses import dataclass
+
+from utils.log import get_logger
+
+logger = get_logger()
+
+QUOTA_HISTORY_FILE = 'quota_history.json'
+DEFAULT_BURN_WINDOW = 3600
+DEFAULT_MAX_SAMPLES = 2000
+
+
+def _env_float(name: str) -> float | None:
+	value = os.getenv(name)
+	if not value:
+		return None
+	try:
+		return float(value)
+	except ValueError:
+		logger.warning(f'{name} must be a number, ignoring')
+		return None
+
+
+@dataclass
+class QuotaSample:
+	"""单次余额采样"""
+
+	timestamp: int
+	quota: float
+	used: float
+
+
+@dataclass
+class QuotaThresholds:
+	"""余额告警阈值"""
+
+	burn_rate: float | None = None
+	min_balance: float | None = None
+	window: float = DEFAULT_BURN_WINDOW
+
+	@classmethod
+	def from_env(cls) -> 'QuotaThresholds':
+		"""从环境变量加载告警阈值"""
+		return cls(
+			burn_rate=_env_float('QUOTA_ALERT_BURN_RATE'),
+			min_balance=_env_float('QUOTA_ALERT_MIN_BALANCE'),
+			window=_env_float('QUOTA_BURN_WINDOW') or DEFAULT_BURN_WINDOW,
+		)
+
+
+def _to_cents(value: float) -> int:
+	return round(value * 100)
+
+
+class QuotaHistory:
+	"""按账号存储的余额采样历史
+
+	存储格式: {account_key: {"base": [timestamp, quota_cents, used_cents], "deltas": [[dt, dq, du], ...]}}
+	"""
+
+	def __init__(self, path: str = QUOTA_HISTORY_FILE, max_samples: int = DEFAULT_MAX_SAMPLES):
+		self.path = path
+		self.max_samples = max_samples
+		self.samples: dict[str, list[QuotaSample]] = {}
+
+	def load(self):
+		"""加载采样历史"""
+		try:
+			if os.path.exists(self.path):
+				with open(self.path, 'r', encoding='utf-8') as f:
+					data = json.load(f)
+				self.samples = {key: self.decode(entry) for key, entry in data.items()}
+		except Exception as e:
+			logger.warning(f'Failed to load quota history: {e}')
+
+	def save(self):
+		"""保存采样历史"""
+		try:
+			data = {key: self.encode(samples) for key, samples in self.samples.items() if samples}
+			with open(self.path, 'w', encoding='utf-8') as f:
+				json.dump(data, f, separators=(',', ':'))
+		except Exception as e:
+			logger.warning(f'Failed to save quota history: {e}')
+
+	@staticmethod
+	def encode(samples: list[QuotaSample]) -> dict:
+		"""增量编码采样列表"""
+		first = samples[0]
+		base = [first.timestamp, _to_cents(first.quota), _to_cents(first.used)]
+		prev = base
+		deltas = []
+		for sample in samples[1:]:
+			current = [sample.timestamp, _to_cents(sample.quota), _to_cents(sample.used)]
+			deltas.append([c - p for c, p in zip(current, prev)])
+			prev = current
+		return {'base': base, 'deltas': deltas}
+
+	@staticmethod
+	def decode(entry: dict) -> list[QuotaSample]:
+		"""解码增量编码的采样列表"""
+		timestamp, quota, used = entry['base']
+		samples = [QuotaSample(timestamp, quota / 100, used / 100)]
+		for dt, dq, du in entry.get('deltas', []):
+			timestamp, quota, used = timestamp + dt, quota + dq, used + du
+			samples.append(QuotaSample(timestamp, quota / 100, used / 100))
+		return samples
+
+	def add(self, account_key: str, sample: QuotaSample):
+		"""追加采样，超出上限时丢弃最旧的采样"""
+		samples = self.samples.setdefault(account_key, [])
+		samples.append(sample)
+		if len(samples) > self.max_samples:
+			del samples[: len(samples) - self.max_samples]
+
+	def latest(self, account_key: str) -> QuotaSample | None:
+		samples = self.samples.get(account_key)
+		return samples[-1] if samples else None
+
+	def burn_rate(self, account_key: str, window: float) -> float | None:
+		"""计算时间窗口内的消耗速率（美元/小时），采样不足时返回 None"""
+		samples = self.samples.get(account_key)
+		if not samples or len(samples) < 2:
+			return None
+
+		latest = samples[-1]
+		window_start = latest.timestamp - window
+		earliest = next((s for s in samples if s.timestamp >= window_start), samples[-1])
+		elapsed = latest.timestamp - earliest.timestamp
+		if elapsed <= 0:
+			return None
+		return (latest.used - earliest.used) * 3600 / elapsed
+
+
+def check_thresholds(history: QuotaHistory, account_key: str, thresholds: QuotaThresholds) -> dict[str, str]:
+	"""检查账号是否超过告警阈值，返回 {告警类型: 描述}"""
+	alerts = {}
+	latest = history.latest(account_key)
+	if not latest:
+		return alerts
+
+	if thresholds.min_balance is not None and latest.quota < thresholds.min_balance:
+		alerts['min_balance'] = f'Balance ${latest.quota} is below ${thresholds.min_balance}'
+
+	if thresholds.burn_rate is not None:
+		rate = history.burn_rate(account_key, thresholds.window)
+		if rate is not None and rate > thresholds.burn_rate:
+			alerts['burn_rate'] = f'Burn rate ${rate:.2f}/h exceeds ${thresholds.burn_rate}/h'
+
+	return alerts
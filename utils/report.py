@@ -0,0 +1,64 @@
+#!/usr/bin/env python3
+"""
+运行报告模块
+
+汇总一次运行中各阶段的性能数据，输出到日志，并可写入 JSON 文件。
+
+环境变量:
+- RUN_REPORT_FILE: 运行报告 JSON 文件路径，不设置则仅输出到日志
+"""
+
+import json
+import os
+import time
+from dataclasses import dataclass, field
+from datetime import datetime
+
+from utils.log import get_logger
+from utils.warmup import HostTiming
+
+logger = get_logger()
+
+
+@dataclass
+class RunReport:
+	"""运行报告"""
+
+	started_at: float = field(default_factory=time.time)
+	host_timings: dict[str, HostTiming] = field(default_factory=dict)
+	skipped_providers: list[str] = field(default_factory=list)
+	concurrency: dict[str, dict] = field(default_factory=dict)
+
+	def to_dict(self) -> dict:
+		return {
+			'started_at': datetime.fromtimestamp(self.started_at).isoformat(timespec='seconds'),
+			'duration_s': round(time.time() - self.started_at, 2),
+			'host_timings': [timing.to_dict() for timing in self.host_timings.values()],
+			'skipped_providers': self.skipped_providers,
+			'concurrency': self.concurrency,
+		}
+
+	def log(self):
+		"""输出运行报告到日志"""
+		logger.info(f'Run duration: {time.time() - self.started_at:.2f}s', tag='REPORT')
+		for timing in self.host_timings.values():
+			logger.bind(provider=timing.provider).info(timing.display(), tag='REPORT')
+		for provider, stats in self.concurrency.items():
+			logger.bind(provider=provider).info(
+				f'Concurrency limit {stats["limit"]} (peak {stats["peak_limit"]}), '
+				f'{stats["requests"]} request(s), {stats["throttled"]} throttled, p95 {stats["p95_ms"]}ms',
+				tag='REPORT',
+			)
+		if self.skipped_providers:
+			logger.info(f'Skipped unreachable provider(s): {", ".join(self.skipped_providers)}', tag='REPORT')
+
+	def save(self, path: str | None = None):
+		"""写入运行报告 JSON 文件"""
+		path = path or os.getenv('RUN_REPORT_FILE')
+		if not path:
+			return
+		try:
+			with open(path, 'w', encoding='utf-8') as f:
+				json.dump(self.to_dict(), f, ensure_ascii=False, indent=2)
+		except Exception as e:
+			logger.warning(f'Failed to save run report: {e}')
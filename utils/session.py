@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+"""
+会话复用模块
+
+- ClientPool: 按 provider 共享的 httpx.Client，复用 TCP/TLS/HTTP2 连接，并通过自适应限制器控制并发；
+  同步请求在 provider 专用的线程池中执行，等待并发名额的请求不会占用其他 provider 的线程
+- WafCookieCache: 按 provider 缓存 WAF cookies，余额监控时同一 provider 的账号共享，避免重复启动浏览器
+"""
+
+import asyncio
+from collections.abc import Callable
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any
+
+import httpx
+
+from utils.config import ProviderConfig
+from utils.limiter import AdaptiveLimiter, LimitedTransport
+
+# 浏览器阶段可能持续较久，延长空闲连接保留时间，使预热建立的连接能被后续请求复用
+KEEPALIVE_EXPIRY = 120.0
+
+
+def build_cookie_header(cookies: dict) -> str:
+	"""将 cookies 字典转换为 Cookie 请求头"""
+	return '; '.join(f'{key}={value}' for key, value in cookies.items())
+
+
+class ClientPool:
+	"""按 provider 共享的 HTTP 客户端池
+
+	账号 cookies 通过显式的 Cookie 请求头传递（优先于客户端 cookie jar），不同账号可安全共享同一连接。
+	"""
+
+	def __init__(self, timeout: float = 30.0):
+		self.timeout = timeout
+		self.clients: dict[str, httpx.Client] = {}
+		self.limiters: dict[str, AdaptiveLimiter] = {}
+		self.executors: dict[str, ThreadPoolExecutor] = {}
+
+	def get(self, provider_config: ProviderConfig) -> httpx.Client:
+		"""获取 provider 对应的客户端，不存在时创建"""
+		client = self.clients.get(provider_config.name)
+		if client is None:
+			limits = httpx.Limits(max_connections=100, max_keepalive_connections=20, keepalive_expiry=KEEPALIVE_EXPIRY)
+			limiter = AdaptiveLimiter(provider_config.name)
+			transport = LimitedTransport(httpx.HTTPTransport(http2=True, limits=limits), limiter)
+			client = httpx.Client(timeout=self.timeout, transport=transport)
+			self.clients[provider_config.name] = client
+			self.limiters[provider_config.name] = limiter
+			# 线程数与并发上限的最大值一致，超出的请求在线程池队列中等待而不是占用线程
+			self.executors[provider_config.name] = ThreadPoolExecutor(
+				max_workers=limiter.max_limit, thread_name_prefix=f'http-{provider_config.name}'
+			)
+		return client
+
+	async def run(self, provider_config: ProviderConfig, func: Callable[..., Any], *args) -> Any:
+		"""在 provider 专用线程池中执行同步请求函数"""
+		self.get(provider_config)
+		loop = asyncio.get_running_loop()
+		return await loop.run_in_executor(self.executors[provider_config.name], func, *args)
+
+	def close(self):
+		"""关闭所有客户端与线程池"""
+		for executor in self.executors.values():
+			executor.shutdown(cancel_futures=True)
+		for client in self.clients.values():
+			client.close()
+		self.executors.clear()
+		self.clients.clear()
+
+
+class WafCookieCache:
+	"""按 provider 缓存的 WAF cookies（余额监控使用）
+
+	cookies 不按固定时间过期，只有请求遇到 WAF 挑战页时才失效并重新获取。
+	"""
+
+	def __init__(self):
+		self.entries: dict[str, dict] = {}
+		self.locks: dict[str, asyncio.Lock] = {}
+
+	def lock(self, provider_name: str) -> asyncio.Lock:
+		"""获取 provider 对应的锁，保证同一 provider 同时只有一个浏览器在获取 cookies"""
+		if provider_name not in self.locks:
+			self.locks[provider_name] = asyncio.Lock()
+		return self.locks[provider_name]
+
+	def get(self, provider_name: str) -> dict | None:
+		return self.entries.get(provider_name)
+
+	def set(self, provider_name: str, cookies: dict):
+		self.entries[provider_name] = cookies
+
+	def invalidate(self, provider_name: str):
+		"""使 provider 的 WAF cookies 失效（请求被 WAF 拦截时）"""
+		self.entries.pop(provider_name, None)
+
+
+waf_cookie_cache = WafCookieCache()
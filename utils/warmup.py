@@ -0,0 +1,150 @@
+#!/usr/bin/env python3
+"""
+连接预热模块
+
+在签到开始前并行通过共享连接池建立到各 provider 的连接（TCP/TLS/HTTP2），后续请求直接复用已建立的连接；
+同时作为健康检查，提前发现无法访问的 provider（失败时重试一次，避免偶发抖动导致整个 provider 被跳过）。
+DNS 耗时通过单独的 getaddrinfo 调用测量，仅用于报告，httpx 建连时会自行解析。
+
+环境变量:
+- WARMUP_TIMEOUT: 单个 provider 预热超时时间（秒），默认 10
+"""
+
+import asyncio
+import os
+import socket
+import time
+from dataclasses import dataclass
+from urllib.parse import urlparse
+
+from utils.config import ProviderConfig
+from utils.limiter import SKIP_LIMITER_EXTENSION
+from utils.log import get_logger
+from utils.session import ClientPool
+
+logger = get_logger()
+
+DEFAULT_WARMUP_TIMEOUT = 10.0
+WARMUP_ATTEMPTS = 2
+WARMUP_RETRY_DELAY = 1.0
+
+
+@dataclass
+class HostTiming:
+	"""单个 provider 的预热耗时（毫秒）"""
+
+	provider: str
+	host: str
+	reachable: bool
+	dns_ms: float | None = None
+	tcp_ms: float | None = None
+	tls_ms: float | None = None
+	total_ms: float | None = None
+	error: str | None = None
+	attempts: int = 1
+
+	def to_dict(self) -> dict:
+		return {
+			'provider': self.provider,
+			'host': self.host,
+			'reachable': self.reachable,
+			'dns_ms': self.dns_ms,
+			'tcp_ms': self.tcp_ms,
+			'tls_ms': self.tls_ms,
+			'total_ms': self.total_ms,
+			'error': self.error,
+			'attempts': self.attempts,
+		}
+
+	def display(self) -> str:
+		if not self.reachable:
+			return f'{self.host} unreachable - {self.error}'
+		parts = [
+			f'{name} {value:.0f}ms'
+			for name, value in (('DNS', self.dns_ms), ('TCP', self.tcp_ms), ('TLS', self.tls_ms))
+			if value is not None
+		]
+		parts.append(f'total {self.total_ms:.0f}ms')
+		return f'{self.host} ' + ', '.join(parts)
+
+
+def get_warmup_timeout() -> float:
+	"""获取预热超时时间"""
+	try:
+		return float(os.getenv('WARMUP_TIMEOUT', DEFAULT_WARMUP_TIMEOUT))
+	except ValueError:
+		return DEFAULT_WARMUP_TIMEOUT
+
+
+def _elapsed_ms(start: float) -> float:
+	return round((time.perf_counter() - start) * 1000, 1)
+
+
+def _probe_host(provider_config: ProviderConfig, client_pool: ClientPool, timeout: float) -> HostTiming:
+	"""测量 DNS 解析耗时并通过连接池建立到 provider 的连接"""
+	parsed = urlparse(provider_config.domain)
+	host = parsed.hostname or provider_config.domain
+	port = parsed.port or (443 if parsed.scheme == 'https' else 80)
+	timing = HostTiming(provider=provider_config.name, host=host, reachable=False)
+
+	# 仅测量解析耗时，结果不会传给 httpx
+	start = time.perf_counter()
+	try:
+		socket.getaddrinfo(host, port, type=socket.SOCK_STREAM)
+		timing.dns_ms = _elapsed_ms(start)
+	except OSError as e:
+		timing.error = f'DNS resolution failed: {e}'
+		return timing
+
+	# 通过 httpx trace 记录连接各阶段耗时
+	stage_starts = {}
+
+	def trace(event_name: str, info: dict):
+		for stage, prefix in (('tcp', 'connection.connect_tcp.'), ('tls', 'connection.start_tls.')):
+			if event_name == f'{prefix}started':
+				stage_starts[stage] = time.perf_counter()
+			elif event_name == f'{prefix}complete' and stage in stage_starts:
+				setattr(timing, f'{stage}_ms', _elapsed_ms(stage_starts[stage]))
+
+	client = client_pool.get(provider_config)
+	request_start = time.perf_counter()
+	try:
+		# 任意 HTTP 响应（包括 WAF 挑战页）都说明连接可用
+		# 预热请求包含建连耗时，不计入并发限制器的延迟采样
+		client.head(provider_config.domain, timeout=timeout, extensions={'trace': trace, SKIP_LIMITER_EXTENSION: True})
+		timing.reachable = True
+	except Exception as e:
+		timing.error = str(e)[:50] or type(e).__name__
+	timing.total_ms = round((timing.dns_ms or 0) + _elapsed_ms(request_start), 1)
+	return timing
+
+
+def warm_up_host(provider_config: ProviderConfig, client_pool: ClientPool, timeout: float) -> HostTiming:
+	"""预热单个 provider，失败时重试，全部失败才视为不可访问"""
+	for attempt in range(1, WARMUP_ATTEMPTS + 1):
+		timing = _probe_host(provider_config, client_pool, timeout)
+		timing.attempts = attempt
+		if timing.reachable or attempt == WARMUP_ATTEMPTS:
+			return timing
+		logger.bind(provider=provider_config.name).info(
+			f'Warm-up attempt {attempt}/{WARMUP_ATTEMPTS} failed ({timing.error}), retrying', tag='WARMUP'
+		)
+		time.sleep(WARMUP_RETRY_DELAY)
+	return timing
+
+
+async def warm_up_providers(providers: list[ProviderConfig], client_pool: ClientPool) -> dict[str, HostTiming]:
+	"""并行预热所有 provider，返回 {provider 名称: 耗时}"""
+	timeout = get_warmup_timeout()
+	timings = await asyncio.gather(
+		*(asyncio.to_thread(warm_up_host, provider_config, client_pool, timeout) for provider_config in providers)
+	)
+
+	for timing in timings:
+		log = logger.bind(provider=timing.provider)
+		if timing.reachable:
+			log.info(timing.display(), tag='WARMUP')
+		else:
+			log.warning(timing.display(), tag='WARMUP')
+
+	return {timing.provider: timing for timing in timings}
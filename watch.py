@@ -0,0 +1,167 @@
+#!/usr/bin/env python3
+"""
+余额监控脚本
+
+只调用用户信息接口并发轮询各账号余额，不执行签到，复用共享连接池与 WAF cookies 缓存，
+在消耗速率或剩余余额超过阈值时发送通知。
+
+环境变量:
+- QUOTA_WATCH_INTERVAL: 轮询间隔（秒），默认 300
+- QUOTA_WATCH_ROUNDS: 轮询轮数，默认 0（持续运行）
+"""
+
+import asyncio
+import os
+import sys
+import time
+
+from dotenv import load_dotenv
+
+from checkin import build_headers, get_user_info, parse_cookies, prepare_cookies
+from utils.config import AccountConfig, AppConfig, load_accounts_config
+from utils.discovery import discover_providers
+from utils.log import get_logger, setup_logging
+from utils.notify import notify
+from utils.quota import QuotaHistory, QuotaSample, QuotaThresholds, check_thresholds
+from utils.session import ClientPool, waf_cookie_cache
+
+load_dotenv()
+
+logger = get_logger()
+
+DEFAULT_WATCH_INTERVAL = 300
+
+
+def _env_int(name: str, default: int) -> int:
+	try:
+		return int(os.getenv(name, default))
+	except ValueError:
+		logger.warning(f'{name} must be an integer, using default {default}')
+		return default
+
+
+async def poll_account(account: AccountConfig, account_index: int, app_config: AppConfig, client_pool: ClientPool):
+	"""查询单个账号的余额"""
+	account_name = account.get_display_name(account_index)
+	log = logger.bind(account=account_name, provider=account.provider)
+
+	provider_config = app_config.get_provider(account.provider)
+	if not provider_config:
+		log.error(f'Provider "{account.provider}" not found in configuration')
+		return None
+
+	user_cookies = parse_cookies(account.cookies)
+	if not user_cookies:
+		log.error('Invalid configuration format')
+		return None
+
+	all_cookies = await prepare_cookies(account_name, provider_config, user_cookies, cookie_cache=waf_cookie_cache)
+	if not all_cookies:
+		return None
+
+	client = client_pool.get(provider_config)
+	headers = build_headers(provider_config, account, all_cookies)
+	user_info_url = f'{provider_config.domain}{provider_config.user_info_path}'
+	user_info = await client_pool.run(provider_config, get_user_info, client, headers, user_info_url)
+
+	if not user_info.get('success'):
+		log.warning(user_info.get('error', 'Unknown error'))
+		if user_info.get('waf_challenge'):
+			# 共享的 WAF cookies 已失效，下一轮重新获取
+			waf_cookie_cache.invalidate(provider_config.name)
+		return None
+
+	return user_info
+
+
+async def watch():
+	"""余额监控主函数"""
+	setup_logging()
+	logger.info('AnyRouter.top quota watch started', tag='SYSTEM')
+
+	app_config = AppConfig.load_from_env()
+	accounts = load_accounts_config()
+	if not accounts:
+		logger.error('Unable to load account configuration, program exits')
+		sys.exit(1)
+
+	client_pool = ClientPool()
+	await discover_providers(app_config, {account.provider for account in accounts}, client_pool)
+
+	interval = _env_int('QUOTA_WATCH_INTERVAL', DEFAULT_WATCH_INTERVAL)
+	rounds = _env_int('QUOTA_WATCH_ROUNDS', 0)
+	thresholds = QuotaThresholds.from_env()
+	logger.info(
+		f'Watching {len(accounts)} account(s) every {interval}s '
+		f'(burn rate alert: {thresholds.burn_rate}, min balance alert: {thresholds.min_balance})'
+	)
+
+	history = QuotaHistory()
+	history.load()
+	active_alerts: set[tuple[str, str]] = set()  # 已告警的 (账号, 告警类型)，恢复正常前不重复通知
+	round_count = 0
+
+	try:
+		while True:
+			round_count += 1
+			alert_content = []
+
+			# 同一轮的账号并发查询，请求经过各 provider 共享的连接池与并发限制器
+			results = await asyncio.gather(
+				*(poll_account(account, i, app_config, client_pool) for i, account in enumerate(accounts)),
+				return_exceptions=True,
+			)
+
+			for i, (account, user_info) in enumerate(zip(accounts, results)):
+				account_name = account.get_display_name(i)
+				log = logger.bind(account=account_name, provider=account.provider)
+				if isinstance(user_info, Exception):
+					log.error(f'Error occurred while polling balance - {str(user_info)[:50]}...')
+					continue
+				if isinstance(user_info, BaseException):
+					raise user_info
+				if not user_info:
+					continue
+
+				account_key = f'account_{i + 1}'
+				history.add(account_key, QuotaSample(int(time.time()), user_info['quota'], user_info['used_quota']))
+
+				burn_rate = history.burn_rate(account_key, thresholds.window)
+				burn_display = f', Burn rate: ${burn_rate:.2f}/h' if burn_rate is not None else ''
+				log.info(f'{user_info["display"]}{burn_display}', tag='BALANCE')
+
+				alerts = check_thresholds(history, account_key, thresholds)
+				for kind, message in alerts.items():
+					if (account_key, kind) in active_alerts:
+						continue
+					log.warning(message, tag='ALERT')
+					alert_content.append(f'[ALERT] {account_name}\n{message}\n{user_info["display"]}')
+
+				active_alerts = {alert for alert in active_alerts if alert[0] != account_key}
+				active_alerts.update((account_key, kind) for kind in alerts)
+
+			history.save()
+
+			if alert_content:
+				notify.push_message('AnyRouter Quota Alert', '\n\n'.join(alert_content), msg_type='text')
+
+			if rounds and round_count >= rounds:
+				break
+			await asyncio.sleep(interval)
+	finally:
+		client_pool.close()
+
+
+def run_watch():
+	"""运行余额监控的包装函数"""
+	try:
+		asyncio.run(watch())
+	except KeyboardInterrupt:
+		logger.warning('Quota watch interrupted by user')
+	except Exception as e:
+		logger.error(f'Error occurred during quota watch: {e}')
+		sys.exit(1)
+
+
+if __name__ == '__main__':
+	run_watch()